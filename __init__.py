@@ -42,10 +42,20 @@ bl_info = {
 
 
 import bpy
+import os
+import csv
+import json
+import time
+from itertools import repeat
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from bpy.app.handlers import persistent
 from bpy.types import Operator, PropertyGroup, Mesh, Panel
-from bpy.props import FloatProperty, CollectionProperty
+from bpy_extras.io_utils import ImportHelper
+from bpy.props import FloatProperty, CollectionProperty, StringProperty, BoolProperty
 from mathutils import Vector
 from .bmesh_utils import BmeshEdit
+from .geometry import Parameters, box, digest
 from .simple_manipulator import Manipulable
 
 
@@ -58,7 +68,513 @@ def update(self, context):
     self.update(context)
 
 
+# datablocks in batch edit, updates are deferred until batch exit
+# {datablock pointer: [nested batch depth, update pending]}
+batch_stack = {}
+
+# meshes shared between objects with equal parameters {parameters key: mesh name}
+shared_meshes = {}
+
+# shared meshes edited by manipulate operator, their users are shared again on exit,
+# updates of these meshes do not split them
+# {mesh pointer: [object pointers]}
+checkouts = {}
+
+
+class ParametricIndex():
+    """
+        Index of parametric meshes and objects using them
+        for O(1) lookup and cheap enumeration of parametric objects,
+        rebuilt on file load, undo and when objects are added or removed
+    """
+    # {object pointer: [object name, data pointer, is parametric]}
+    # objects are resolved on lookup, so removed ones are never returned
+    objects = {}
+    # {mesh pointer: set of object pointers}
+    meshes = {}
+    # number of objects indexed
+    count = 0
+    dirty = True
+
+    @staticmethod
+    def _is_parametric(o):
+        """
+            private, brute force check
+        """
+        try:
+            return o.data is not None and 'ParametricObjectProperty' in o.data
+        except (AttributeError, TypeError):
+            return False
+
+    @staticmethod
+    def _data_pointer(o):
+        if o.data is None:
+            return 0
+        return o.data.as_pointer()
+
+    @classmethod
+    def rebuild(cls):
+        cls.objects.clear()
+        cls.meshes.clear()
+        cls.count = 0
+        for o in bpy.data.objects:
+            cls.add(o)
+        cls.dirty = False
+
+    @classmethod
+    def check(cls):
+        if cls.dirty:
+            cls.rebuild()
+
+    @classmethod
+    def add(cls, o):
+        """
+            index object, call when an object is created or its data change
+        """
+        key = o.as_pointer()
+        cls.remove(key)
+        entry = [o.name, cls._data_pointer(o), cls._is_parametric(o)]
+        cls.objects[key] = entry
+        cls.count += 1
+        if entry[2]:
+            cls.meshes.setdefault(entry[1], set()).add(key)
+        return entry
+
+    @classmethod
+    def remove(cls, key):
+        """
+            remove object pointer from index
+        """
+        entry = cls.objects.pop(key, None)
+        if entry is None:
+            return
+        cls.count -= 1
+        if entry[2]:
+            users = cls.meshes.get(entry[1])
+            if users is not None:
+                users.discard(key)
+                if len(users) < 1:
+                    del cls.meshes[entry[1]]
+
+    @classmethod
+    def _resolve(cls, keys):
+        """
+            private, objects of indexed pointers,
+            looked up by name, or in a single pass over all objects
+            when there are many or an object was renamed,
+            removed objects are dropped from index,
+            entries of objects whose data changed are updated
+        """
+        objs = []
+        missing = []
+        if len(keys) < 16:
+            for key in keys:
+                o = bpy.data.objects.get(cls.objects[key][0])
+                if o is not None and o.as_pointer() == key:
+                    objs.append(o)
+                else:
+                    missing.append(key)
+        else:
+            missing = keys
+        if len(missing) > 0:
+            by_pointer = {o.as_pointer(): o for o in bpy.data.objects}
+            for key in missing:
+                o = by_pointer.get(key)
+                if o is None:
+                    cls.remove(key)
+                else:
+                    objs.append(o)
+        for o in objs:
+            entry = cls.objects[o.as_pointer()]
+            if entry[0] != o.name or entry[1] != cls._data_pointer(o):
+                cls.add(o)
+        return objs
+
+    @classmethod
+    def resolve(cls, keys):
+        """
+            objects of pointers, removed objects are skipped
+        """
+        cls.check()
+        return cls._resolve([key for key in keys if key in cls.objects])
+
+    @classmethod
+    def is_parametric(cls, o):
+        if o is None:
+            return False
+        cls.check()
+        entry = cls.objects.get(o.as_pointer())
+        if entry is None or entry[1] != cls._data_pointer(o):
+            entry = cls.add(o)
+        return entry[2]
+
+    @classmethod
+    def parametric_objects(cls):
+        """
+            list of all parametric objects
+        """
+        cls.check()
+        objs = cls._resolve([key for key, entry in cls.objects.items() if entry[2]])
+        return [o for o in objs if cls.objects[o.as_pointer()][2]]
+
+    @classmethod
+    def users(cls, me):
+        """
+            list of objects using a parametric mesh
+        """
+        cls.check()
+        key = me.as_pointer()
+        objs = cls._resolve(list(cls.meshes.get(key, ())))
+        return [o for o in objs if cls.objects[o.as_pointer()][1] == key]
+
+    @classmethod
+    def validate(cls):
+        """
+            compare index against a brute force scan of all objects
+            return names of objects not matching index
+        """
+        cls.check()
+        errors = []
+        for o in bpy.data.objects:
+            entry = cls.objects.get(o.as_pointer())
+            expected = cls._is_parametric(o)
+            if (entry is None or
+                    entry[1] != cls._data_pointer(o) or
+                    entry[2] != expected or
+                    (expected and o.as_pointer() not in cls.meshes.get(entry[1], ()))):
+                errors.append(o.name)
+        if len(cls.objects) != len(bpy.data.objects) or cls.count != len(cls.objects):
+            errors.append("{} indexed objects for {} objects".format(len(cls.objects), len(bpy.data.objects)))
+        return errors
+
+
+@persistent
+def index_dirty(dummy):
+    ParametricIndex.dirty = True
+
+
+@persistent
+def index_update(scene):
+    """
+        rebuild index when objects are added or removed
+    """
+    if bpy.data.objects.is_updated and len(bpy.data.objects) != ParametricIndex.count:
+        ParametricIndex.dirty = True
+
+
+def shared_key(params):
+    """
+        hashable key of parameters, objects with equal keys may share a mesh
+    """
+    return json.dumps([round(v, 5) for v in params])
+
+
+def shared_mesh(key):
+    """
+        return shared mesh matching parameters key or None
+    """
+    name = shared_meshes.get(key)
+    if name is not None:
+        me = bpy.data.meshes.get(name)
+        if (me is not None and
+                'ParametricObjectProperty' in me and
+                me.ParametricObjectProperty[0].shared_key == key):
+            return me
+        del shared_meshes[key]
+    return None
+
+
+def checkout_selection(context, objs):
+    """
+        copy on write of shared meshes used by objs before editing them together,
+        a shared mesh is edited in place when all its users are in objs,
+        else objs users get a single private copy of it
+        return checked out {mesh pointer: [object pointers]}
+    """
+    by_mesh = {}
+    for o in objs:
+        if ParametricIndex.is_parametric(o) and o.data.ParametricObjectProperty[0].shared_key:
+            users = by_mesh.setdefault(o.data.as_pointer(), [])
+            if o not in users:
+                users.append(o)
+    res = {}
+    for users in by_mesh.values():
+        me = users[0].data
+        if me.users > len(users):
+            me = me.ParametricObjectProperty[0].checkout(context, users[0]).id_data
+            for o in users[1:]:
+                o.data = me
+                ParametricIndex.add(o)
+        res[me.as_pointer()] = [o.as_pointer() for o in users]
+    return res
+
+
+def new_mesh(context, params, dedupe=False):
+    """
+        return a mesh built from Parameters record with its parametric datablock,
+        when dedupe is enabled return the shared mesh matching parameters if any
+    """
+    if dedupe:
+        key = shared_key(params)
+        m = shared_mesh(key)
+        if m is not None:
+            return m
+
+    m = bpy.data.meshes.new("Parametric Object")
+
+    # attach parametric datablock
+    d = m.ParametricObjectProperty.add()
+
+    # do not update while setting params
+    with d.batch(context):
+
+        # update params
+        for attr, value in zip(Parameters._fields, params):
+            setattr(d, attr, value)
+        if dedupe:
+            d.share(key)
+
+        # setup manipulators for on screen editing
+        s = d.manipulators.add()
+        s.prop1_name = "x"
+        s = d.manipulators.add()
+        s.prop1_name = "y"
+        s = d.manipulators.add()
+        s.normal = Vector((0, 1, 0))
+        s.prop1_name = "z"
+
+    # mesh data is created by update on batch exit
+    return m
+
+
+def bulk_create(context, rows, locations=None, dedupe=False, batch_size=1000):
+    """
+        create many objects without changing selection and active object
+        nor setting up manipulators
+        rows: iterable of Parameters records
+        locations: optional iterable of locations, one per row, may be None
+        return created objects and elapsed time in seconds
+    """
+    t = time.perf_counter()
+    scene = context.scene
+    objects = []
+    rows = list(rows)
+    if locations is None:
+        locations = repeat(None, len(rows))
+    locations = list(locations)
+    if len(locations) != len(rows):
+        raise RuntimeError("Got {} locations for {} rows".format(len(locations), len(rows)))
+    for i in range(0, len(rows), batch_size):
+        meshes = [new_mesh(context, params, dedupe=dedupe) for params in rows[i:i + batch_size]]
+        batch = [bpy.data.objects.new("Parametric Object", m) for m in meshes]
+        for o, loc in zip(batch, locations[i:i + batch_size]):
+            if loc is not None:
+                o.location = loc
+            scene.objects.link(o)
+            ParametricIndex.add(o)
+        objects.extend(batch)
+    return objects, time.perf_counter() - t
+
+
+def copy_to_selection(context, source, targets):
+    """
+        copy parameters of source datablock to target objects,
+        objects sharing a mesh are rebuilt once
+        return number of rebuilt meshes and updated objects
+    """
+    params = source.params
+    # group targets by mesh
+    meshes = {}
+    for o in targets:
+        o, d = OBJECT_PT_parametric_object.params(o)
+        if d is None or d == source:
+            continue
+        meshes.setdefault(o.data.name, []).append(o)
+
+    rebuilt, updated = 0, 0
+    for objects in meshes.values():
+        d = objects[0].data.ParametricObjectProperty[0]
+        if d.params == params:
+            continue
+        updated += len(objects)
+        if d.shared_key:
+            # copy on write, use shared mesh matching parameters
+            m = shared_mesh(shared_key(params))
+            if m is None:
+                m = new_mesh(context, params, dedupe=True)
+                rebuilt += 1
+            for o in objects:
+                o.data = m
+                ParametricIndex.add(o)
+        else:
+            d.set_many(context, **params._asdict())
+            rebuilt += 1
+    return rebuilt, updated
+
+
+def read_table(filepath):
+    """
+        read Parameters rows and locations from a parameter table
+        csv: header with x, y, z and optional loc_x, loc_y, loc_z columns
+        json: list of {"x": 1, "y": 1, "z": 1, "location": [0, 0, 0]}, location is optional
+        return rows and locations, location is None when not set
+    """
+    rows, locations = [], []
+    if filepath.lower().endswith(".json"):
+        with open(filepath) as f:
+            table = json.load(f)
+        for row in table:
+            rows.append(Parameters(*[float(row[attr]) for attr in Parameters._fields]))
+            loc = row.get("location")
+            if loc is not None:
+                loc = tuple(float(v) for v in loc)
+                if len(loc) != 3:
+                    raise ValueError("location must have 3 coords, got {}".format(len(loc)))
+            locations.append(loc)
+    else:
+        with open(filepath, newline='') as f:
+            for row in csv.DictReader(f):
+                rows.append(Parameters(*[float(row[attr]) for attr in Parameters._fields]))
+                if row.get("loc_x"):
+                    locations.append(tuple(float(row[attr]) for attr in ("loc_x", "loc_y", "loc_z")))
+                else:
+                    locations.append(None)
+    return rows, locations
+
+
+def resync(context, force=False):
+    """
+        rebuild meshes when stamped digest does not match
+        parameters and generator version
+        force: rebuild all meshes
+        return number of rebuilt and skipped meshes
+    """
+    rebuilt, skipped = 0, 0
+    for me in bpy.data.meshes:
+        if 'ParametricObjectProperty' not in me:
+            continue
+        d = me.ParametricObjectProperty[0]
+        if not force and d.digest == digest(d.params):
+            skipped += 1
+            continue
+        d.rebuild(context)
+        d.update_manipulators()
+        rebuilt += 1
+    return rebuilt, skipped
+
+
+@persistent
+def resync_on_load(dummy):
+    rebuilt, skipped = resync(bpy.context)
+    print("ParametricObject resync: {} rebuilt {} skipped".format(rebuilt, skipped))
+
+
+@persistent
+def shared_meshes_sync(dummy):
+    """
+        rebuild shared meshes registry on file load
+    """
+    shared_meshes.clear()
+    for me in bpy.data.meshes:
+        if 'ParametricObjectProperty' in me:
+            key = me.ParametricObjectProperty[0].shared_key
+            if key:
+                shared_meshes.setdefault(key, me.name)
+
+
+# geometry generated on worker threads, committed on main thread
+# {mesh pointer: [mesh name, parameters, future]}
+async_jobs = {}
+# jobs submitted, committed, dropped because superseded and failed, for profiling
+async_stats = {'submitted': 0, 'committed': 0, 'dropped': 0, 'failed': 0}
+# interval in seconds between commits of finished jobs
+async_interval = 0.02
+async_pool = None
+
+
+def async_submit(d):
+    """
+        generate geometry of datablock on a worker thread,
+        drop pending job of same mesh
+    """
+    global async_pool
+    if async_pool is None:
+        async_pool = ThreadPoolExecutor(max_workers=os.cpu_count() or 1)
+    me = d.id_data
+    key = me.as_pointer()
+    job = async_jobs.get(key)
+    if job is not None:
+        job[2].cancel()
+        async_stats['dropped'] += 1
+    params = d.params
+    async_jobs[key] = [me.name, params, async_pool.submit(box, params)]
+    async_stats['submitted'] += 1
+    if hasattr(bpy.app, "timers") and not bpy.app.timers.is_registered(async_timer):
+        bpy.app.timers.register(async_timer, first_interval=async_interval)
+
+
+def async_commit():
+    """
+        write finished geometry to meshes on main thread,
+        failed jobs are reported and leave their mesh unchanged, other jobs are still committed
+        return True when jobs are pending
+    """
+    for key, job in list(async_jobs.items()):
+        name, params, future = job
+        if not future.done():
+            continue
+        del async_jobs[key]
+        me = bpy.data.meshes.get(name)
+        if me is None or me.as_pointer() != key:
+            async_stats['dropped'] += 1
+            continue
+        d = me.ParametricObjectProperty[0]
+        if d.params != params:
+            # parameters changed by a synchronous update
+            async_stats['dropped'] += 1
+            continue
+        try:
+            # worker exceptions are raised here, whatever their type
+            BmeshEdit.writemesh(me, future.result())
+        except Exception as ex:
+            async_stats['failed'] += 1
+            print("ParametricObject async update of {} failed: {}: {}".format(name, type(ex).__name__, ex))
+            continue
+        d.digest = digest(params)
+        ParametricObjectProperty.rebuild_count += 1
+        async_stats['committed'] += 1
+    return len(async_jobs) > 0
+
+
+def async_timer():
+    """
+        bpy.app.timers callback
+    """
+    if async_commit():
+        return async_interval
+    return None
+
+
+@persistent
+def async_commit_handler(scene):
+    """
+        commit finished jobs when bpy.app.timers is not available (2.7x)
+    """
+    if len(async_jobs) > 0:
+        async_commit()
+
+
+@persistent
+def async_clear(dummy):
+    """
+        drop pending jobs on file load, meshes pointers are no more valid
+    """
+    async_jobs.clear()
+
+
 class ParametricObjectProperty(Manipulable, PropertyGroup):
+    # number of mesh rebuilds, for profiling and tests
+    rebuild_count = 0
 
     x = FloatProperty(
             name='width',
@@ -78,83 +594,228 @@ class ParametricObjectProperty(Manipulable, PropertyGroup):
             default=2.0, precision=2,
             description='Height', update=update,
             )
+    shared_key = StringProperty(
+            description="Parameters key of mesh shared between objects with equal parameters, empty when not shared"
+            )
+    digest = StringProperty(
+            description="Digest of parameters and generator version the mesh was built with"
+            )
+    async_update = BoolProperty(
+            name="Async",
+            default=False,
+            description="Generate geometry on a worker thread, mesh is updated when ready"
+            )
+
+    @property
+    def params(self):
+        """
+            Parameters record for geometry kernel
+        """
+        return Parameters(self.x, self.y, self.z)
+
+    @property
+    def geometry(self):
+        """
+            Object geometry as MeshArrays
+        """
+        return box(self.params)
 
     @property
     def verts(self):
         """
             Object vertices coords
         """
-        x = self.x
-        y = self.y
-        z = self.z
-        return [
-            (0, y, 0),
-            (0, 0, 0),
-            (x, 0, 0),
-            (x, y, 0),
-            (0, y, z),
-            (0, 0, z),
-            (x, 0, z),
-            (x, y, z)
-        ]
+        return self.geometry.verts
 
     @property
     def faces(self):
         """
             Object faces vertices index
         """
-        return [
-            (0, 1, 2, 3),
-            (7, 6, 5, 4),
-            (7, 4, 0, 3),
-            (4, 5, 1, 0),
-            (5, 6, 2, 1),
-            (6, 7, 3, 2)
-        ]
+        return self.geometry.faces
 
     @property
     def uvs(self):
         """
             Object faces uv coords
         """
-        return [
-            [(0, 0), (0, 1), (1, 1), (1, 0)],
-            [(0, 0), (0, 1), (1, 1), (1, 0)],
-            [(0, 0), (0, 1), (1, 1), (1, 0)],
-            [(0, 0), (0, 1), (1, 1), (1, 0)],
-            [(0, 0), (0, 1), (1, 1), (1, 0)],
-            [(0, 0), (0, 1), (1, 1), (1, 0)]
-        ]
+        return self.geometry.face_uvs
 
     @property
     def matids(self):
         """
             Object material indexes
         """
-        return [0, 0, 0, 0, 0, 0]
+        return self.geometry.matids.tolist()
+
+    @contextmanager
+    def batch(self, context):
+        """
+            defer updates while editing many parameters,
+            run a single update on exit when any parameter changed
+            with props.batch(context):
+                props.x = 1
+                props.y = 2
+        """
+        key = self.as_pointer()
+        state = batch_stack.setdefault(key, [0, False])
+        state[0] += 1
+        try:
+            yield self
+        finally:
+            state[0] -= 1
+            if state[0] < 1:
+                del batch_stack[key]
+                if state[1]:
+                    self.update(context)
+
+    def set_many(self, context, **params):
+        """
+            set many parameters at once with a single update
+            props.set_many(context, x=1, y=2, z=3)
+        """
+        with self.batch(context):
+            for attr, value in params.items():
+                setattr(self, attr, value)
+
+    def share(self, key):
+        """
+            register mesh as shared for parameters key,
+            when registry already hold another mesh for key
+            this one is not shared and its shared_key is cleared
+            return True when mesh is the shared one
+        """
+        me = self.id_data
+        if self.shared_key and shared_meshes.get(self.shared_key) == me.name:
+            del shared_meshes[self.shared_key]
+        shared = shared_mesh(key)
+        if shared is None:
+            shared_meshes[key] = me.name
+            shared = me
+        if shared == me:
+            self.shared_key = key
+            return True
+        self.shared_key = ""
+        return False
+
+    def checkout(self, context, o):
+        """
+            copy on write, give object o a private copy of shared mesh
+            return the copy parameters
+        """
+        me = self.id_data.copy()
+        o.data = me
+        ParametricIndex.add(o)
+        return me.ParametricObjectProperty[0]
+
+    def dedupe(self, context, o):
+        """
+            make object o use the shared mesh matching its parameters if any,
+            or share its mesh, remove private mesh when orphan
+        """
+        me = self.id_data
+        key = shared_key(self.params)
+        shared = shared_mesh(key)
+        if shared is None:
+            self.share(key)
+        elif shared != me:
+            o.data = shared
+            ParametricIndex.add(o)
+            if me.users < 1:
+                bpy.data.meshes.remove(me)
+
+    def split(self, context, o):
+        """
+            copy on write when editing a shared mesh,
+            object o get its own mesh with new parameters
+            and shared mesh restore its parameters from key
+        """
+        d = self.checkout(context, o)
+        # the copy is private
+        d.shared_key = ""
+        with self.batch(context):
+            for attr, value in zip(Parameters._fields, json.loads(self.shared_key)):
+                setattr(self, attr, value)
+        d.update(context)
+
+    def manipulable_objects(self, context):
+        """
+            manipulate every selected parametric object along with active one
+        """
+        active = context.active_object
+        objs = [(active, self)]
+        for o in context.selected_objects:
+            if o != active and ParametricIndex.is_parametric(o):
+                objs.append((o, o.data.ParametricObjectProperty[0]))
+        return objs
+
+    def manipulable_exit(self, context):
+        """
+            share meshes checked out by manipulate operator again
+            when leaving manipulate mode
+        """
+        objs = ParametricIndex.resolve([key for users in checkouts.values() for key in users])
+        checkouts.clear()
+        for o in objs:
+            if ParametricIndex.is_parametric(o):
+                o.data.ParametricObjectProperty[0].dedupe(context, o)
 
     def update(self, context):
 
-        old = context.active_object
+        state = batch_stack.get(self.as_pointer())
+        if state is not None:
+            state[1] = True
+            return
 
-        o, props = OBJECT_PT_parametric_object.params(old)
+        # rebuild own mesh whatever the active object is,
+        # active object only tell which user of a shared mesh is edited
+        o, props = OBJECT_PT_parametric_object.params(context.active_object)
         if props != self:
-            return
+            o = None
 
-        o.select = True
-        context.scene.objects.active = o
+        if self.shared_key:
+            key = shared_key(self.params)
+            if key != self.shared_key:
+                if (self.id_data.users > 1 and o is not None and
+                        self.id_data.as_pointer() not in checkouts):
+                    self.split(context, o)
+                    return
+                self.share(key)
+
+        # rebuild at most once per interval while dragging a manipulator
+        if not self.manipulable_throttle(context):
+            if self.async_update:
+                async_submit(self)
+            else:
+                self.rebuild(context, o)
+
+        self.update_manipulators()
 
-        BmeshEdit.buildmesh(context, o, self.verts, self.faces, matids=self.matids, uvs=self.uvs)
+    def rebuild(self, context, o=None):
+        """
+            build mesh and stamp it with parameters digest
+            o: object using the mesh, when None any user of the mesh,
+            meshes without users are always written in object mode
+            as the bmesh path require an object, whatever BmeshEdit.fast is
+        """
+        if o is None:
+            users = ParametricIndex.users(self.id_data)
+            if len(users) > 0:
+                o = users[0]
+        if o is None:
+            BmeshEdit.writemesh(self.id_data, self.geometry)
+        else:
+            # object mode write path does not change selection nor active object
+            BmeshEdit.commit(context, o, self.geometry)
+        self.digest = digest(self.params)
+        ParametricObjectProperty.rebuild_count += 1
 
+    def update_manipulators(self):
         # setup 3d points for gl manipulators
         self.manipulators[0].set_pts([(0, 0, 0), (self.x, 0, 0), (1, 0, 0)])
         self.manipulators[1].set_pts([(0, 0, 0), (0, self.y, 0), (-1, 0, 0)])
         self.manipulators[2].set_pts([(self.x, 0, 0), (self.x, 0, self.z), (-1, 0, 0)])
 
-        # restore context
-        old.select = True
-        context.scene.objects.active = old
-
 # ------------------------------------------------------------------
 # Define panel class to show object parameters in ui panel (N)
 # ------------------------------------------------------------------
@@ -176,21 +837,19 @@ class OBJECT_PT_parametric_object(Panel):
         layout.prop(props, 'x')
         layout.prop(props, 'y')
         layout.prop(props, 'z')
+        layout.prop(props, 'async_update')
         layout.operator("object.parametric_object_manipulate")
+        layout.operator("object.parametric_object_copy")
 
     @classmethod
     def params(cls, o):
         if cls.filter(o):
-            if 'ParametricObjectProperty' in o.data:
-                return o, o.data.ParametricObjectProperty[0]
+            return o, o.data.ParametricObjectProperty[0]
         return o, None
 
     @classmethod
     def filter(cls, o):
-        try:
-            return o.data is not None and bool('ParametricObjectProperty' in o.data)
-        except:
-            return False
+        return ParametricIndex.is_parametric(o)
 
     @classmethod
     def poll(cls, context):
@@ -229,38 +888,24 @@ class OBJECT_OT_parametric_object(Operator):
             default=2.0, precision=2,
             description='height'
             )
+    dedupe = BoolProperty(
+            name="Share mesh",
+            default=False,
+            description="Share mesh between objects with equal parameters"
+            )
 
     def create(self, context):
         """
             expose only basic params in operator
             use object property for other params
         """
-        m = bpy.data.meshes.new("Parametric Object")
+        m = new_mesh(context, Parameters(self.x, self.y, self.z), dedupe=self.dedupe)
         o = bpy.data.objects.new("Parametric Object", m)
-
-        # attach parametric datablock
-        d = m.ParametricObjectProperty.add()
-
-        # update params
-        d.x = self.x
-        d.y = self.y
-        d.z = self.z
-
-        # setup manipulators for on screen editing
-        s = d.manipulators.add()
-        s.prop1_name = "x"
-        s = d.manipulators.add()
-        s.prop1_name = "y"
-        s = d.manipulators.add()
-        s.normal = Vector((0, 1, 0))
-        s.prop1_name = "z"
-
         context.scene.objects.link(o)
+        ParametricIndex.add(o)
         # make newly created object active
         o.select = True
         context.scene.objects.active = o
-        # create mesh data
-        d.update(context)
         return o
 
     def execute(self, context):
@@ -277,6 +922,96 @@ class OBJECT_OT_parametric_object(Operator):
             self.report({'WARNING'}, "Option only valid in Object mode")
             return {'CANCELLED'}
 
+# ------------------------------------------------------------------
+# Define operator class to copy parameters to selected objects
+# ------------------------------------------------------------------
+
+
+class OBJECT_OT_parametric_object_copy(Operator):
+    bl_idname = "object.parametric_object_copy"
+    bl_label = "Copy to selection"
+    bl_description = "Copy parameters of active object to selected objects"
+    bl_category = 'Sample'
+    bl_options = {'REGISTER', 'UNDO'}
+
+    @classmethod
+    def poll(self, context):
+        return OBJECT_PT_parametric_object.filter(context.active_object)
+
+    def execute(self, context):
+        if context.mode == "OBJECT":
+            o, d = OBJECT_PT_parametric_object.params(context.active_object)
+            rebuilt, updated = copy_to_selection(context, d, context.selected_objects)
+            self.report({'INFO'}, "Updated {} objects, rebuilt {} meshes".format(updated, rebuilt))
+            return {'FINISHED'}
+        else:
+            self.report({'WARNING'}, "Option only valid in Object mode")
+            return {'CANCELLED'}
+
+# ------------------------------------------------------------------
+# Define operator class to create objects from a parameter table
+# ------------------------------------------------------------------
+
+
+class OBJECT_OT_parametric_object_bulk(Operator, ImportHelper):
+    bl_idname = "object.parametric_object_bulk"
+    bl_label = "Bulk create"
+    bl_description = "Create parametric objects from a csv or json parameter table"
+    bl_category = 'Sample'
+    bl_options = {'REGISTER', 'UNDO'}
+
+    filter_glob = StringProperty(
+            default="*.csv;*.json",
+            options={'HIDDEN'}
+            )
+    dedupe = BoolProperty(
+            name="Share mesh",
+            default=False,
+            description="Share mesh between objects with equal parameters"
+            )
+
+    def execute(self, context):
+        if context.mode == "OBJECT":
+            try:
+                rows, locations = read_table(self.filepath)
+            except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+                self.report({'WARNING'}, "Unable to read {}: {}".format(self.filepath, e))
+                return {'CANCELLED'}
+            objects, seconds = bulk_create(context, rows, locations, dedupe=self.dedupe)
+            self.report({'INFO'}, "Created {} objects in {:.2f}s ({:.0f} objects/s)".format(
+                len(objects), seconds, len(objects) / max(seconds, 1e-6)))
+            return {'FINISHED'}
+        else:
+            self.report({'WARNING'}, "Option only valid in Object mode")
+            return {'CANCELLED'}
+
+# ------------------------------------------------------------------
+# Define operator class to rebuild stale meshes
+# ------------------------------------------------------------------
+
+
+class OBJECT_OT_parametric_object_resync(Operator):
+    bl_idname = "object.parametric_object_resync"
+    bl_label = "Resync"
+    bl_description = "Rebuild parametric meshes not matching their parameters"
+    bl_category = 'Sample'
+    bl_options = {'REGISTER', 'UNDO'}
+
+    force = BoolProperty(
+            name="Force",
+            default=False,
+            description="Rebuild all meshes"
+            )
+
+    def execute(self, context):
+        if context.mode == "OBJECT":
+            rebuilt, skipped = resync(context, self.force)
+            self.report({'INFO'}, "Rebuilt {} meshes, skipped {}".format(rebuilt, skipped))
+            return {'FINISHED'}
+        else:
+            self.report({'WARNING'}, "Option only valid in Object mode")
+            return {'CANCELLED'}
+
 # ------------------------------------------------------------------
 # Define operator class to manipulate object
 # ------------------------------------------------------------------
@@ -298,6 +1033,9 @@ class OBJECT_OT_parametric_object_manipulate(Operator):
     def invoke(self, context, event):
         if context.space_data.type == 'VIEW_3D':
             o = context.active_object
+            # copy on write, only for shared meshes having unselected users
+            checkouts.clear()
+            checkouts.update(checkout_selection(context, [o] + context.selected_objects))
             self.d = o.data.ParametricObjectProperty[0]
             self.d.manipulable_invoke(context)
             context.window_manager.modal_handler_add(self)
@@ -329,6 +1067,10 @@ class TOOLS_PT_parametric_object(Panel):
         box.label("Objects")
         row = box.row(align=True)
         row.operator("object.parametric_object")
+        row = box.row(align=True)
+        row.operator("object.parametric_object_bulk")
+        row = box.row(align=True)
+        row.operator("object.parametric_object_resync")
 
 
 def register():
@@ -337,11 +1079,43 @@ def register():
     bpy.utils.register_class(OBJECT_OT_parametric_object_manipulate)
     bpy.utils.register_class(OBJECT_PT_parametric_object)
     bpy.utils.register_class(OBJECT_OT_parametric_object)
+    bpy.utils.register_class(OBJECT_OT_parametric_object_copy)
+    bpy.utils.register_class(OBJECT_OT_parametric_object_bulk)
+    bpy.utils.register_class(OBJECT_OT_parametric_object_resync)
     bpy.utils.register_class(TOOLS_PT_parametric_object)
+    # state of previous file is dropped before resync on load
+    bpy.app.handlers.load_post.append(index_dirty)
+    bpy.app.handlers.load_post.append(async_clear)
+    bpy.app.handlers.load_post.append(shared_meshes_sync)
+    bpy.app.handlers.load_post.append(resync_on_load)
+    bpy.app.handlers.undo_post.append(index_dirty)
+    bpy.app.handlers.redo_post.append(index_dirty)
+    bpy.app.handlers.scene_update_post.append(index_update)
+    if not hasattr(bpy.app, "timers"):
+        bpy.app.handlers.scene_update_post.append(async_commit_handler)
 
 
 def unregister():
+    global async_pool
+    if not hasattr(bpy.app, "timers"):
+        bpy.app.handlers.scene_update_post.remove(async_commit_handler)
+    elif bpy.app.timers.is_registered(async_timer):
+        bpy.app.timers.unregister(async_timer)
+    bpy.app.handlers.load_post.remove(async_clear)
+    async_jobs.clear()
+    if async_pool is not None:
+        async_pool.shutdown(wait=False)
+        async_pool = None
+    bpy.app.handlers.scene_update_post.remove(index_update)
+    bpy.app.handlers.redo_post.remove(index_dirty)
+    bpy.app.handlers.undo_post.remove(index_dirty)
+    bpy.app.handlers.load_post.remove(index_dirty)
+    bpy.app.handlers.load_post.remove(resync_on_load)
+    bpy.app.handlers.load_post.remove(shared_meshes_sync)
     bpy.utils.unregister_class(TOOLS_PT_parametric_object)
+    bpy.utils.unregister_class(OBJECT_OT_parametric_object_resync)
+    bpy.utils.unregister_class(OBJECT_OT_parametric_object_bulk)
+    bpy.utils.unregister_class(OBJECT_OT_parametric_object_copy)
     bpy.utils.unregister_class(OBJECT_OT_parametric_object_manipulate)
     bpy.utils.unregister_class(OBJECT_OT_parametric_object)
     bpy.utils.unregister_class(OBJECT_PT_parametric_object)
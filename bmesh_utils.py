@@ -26,9 +26,24 @@
 # ----------------------------------------------------------
 import bpy
 import bmesh
+import time
+import numpy as np
+from .geometry import MeshArrays, flat_matids, flat_uvs, quads, grid, remove_loose
+from .geometry import weld as weld_verts
 
 
 class BmeshEdit():
+    # default write path of buildmesh:
+    # True : object mode, fill mesh data from flat arrays
+    # False: bmesh through edit mode
+    fast = True
+    # accumulated cost of write paths {path: [calls, seconds]}
+    timings = {}
+    # accumulated attributes writes {attribute: [writes, bytes]}
+    written = {}
+    # attributes written by last commit {attribute: bytes}, empty when skipped
+    last_report = {}
+
     @staticmethod
     def _start(context, o):
         """
@@ -52,30 +67,231 @@ class BmeshEdit():
         bm.free()
 
     @staticmethod
-    def _matids(bm, matids):
-        for i, matid in enumerate(matids):
-            bm.faces[i].material_index = matid
+    def _set(collection, attr, data, key, report, diff=True):
+        """
+            private, bulk set attribute in object mode
+            diff: only write when attribute differ from mesh content
+            report: {key: bytes written}
+            return True when written
+        """
+        if diff:
+            buf = np.empty(len(data), dtype=data.dtype)
+            collection.foreach_get(attr, buf)
+            if np.array_equal(buf, data):
+                return False
+        collection.foreach_set(attr, data)
+        report[key] = report.get(key, 0) + data.nbytes
+        return True
+
+    @staticmethod
+    def _matids(me, matids, report, diff=True):
+        """
+            private, bulk set material index of faces in object mode
+            matids: int16 (n faces) array, see geometry.flat_matids
+        """
+        return BmeshEdit._set(me.polygons, "material_index", matids, 'matids', report, diff)
+
+    @staticmethod
+    def _uvs(me, uvs, report, diff=True):
+        """
+            private, bulk set uvs of loops in object mode
+            uvs: float32 (2 * n loops) array, see geometry.flat_uvs
+        """
+        return BmeshEdit._set(BmeshEdit._uv_layer(me).data, "uv", uvs, 'uvs', report, diff)
+
+    @staticmethod
+    def _report(report):
+        """
+            private, store attributes written by a commit
+        """
+        for key, size in report.items():
+            stat = BmeshEdit.written.setdefault(key, [0, 0])
+            stat[0] += 1
+            stat[1] += size
+        BmeshEdit.last_report = report
+        return report
+
+    @staticmethod
+    def _aspect(me, matids, uvs):
+        """
+            private, validate then set material index and uvs of mesh in object mode
+            only write attributes that differ
+            return {attribute: bytes written}
+        """
+        t = time.perf_counter()
+        loop_total = np.empty(len(me.polygons), dtype=np.int32)
+        me.polygons.foreach_get("loop_total", loop_total)
+        matids = flat_matids(matids, len(loop_total))
+        uvs = flat_uvs(uvs, loop_total)
+        report = {}
+        BmeshEdit._matids(me, matids, report)
+        BmeshEdit._uvs(me, uvs, report)
+        if report:
+            me.update()
+        BmeshEdit._timing('aspect' if report else 'skip', t)
+        return BmeshEdit._report(report)
 
     @staticmethod
-    def _uvs(bm, uvs):
-        layer = bm.loops.layers.uv.verify()
-        l_i = len(uvs)
-        for i, face in enumerate(bm.faces):
-            if i > l_i:
-                raise RuntimeError("Missing uvs for face {}".format(i))
-            l_j = len(uvs[i])
-            for j, loop in enumerate(face.loops):
-                if j > l_j:
-                    raise RuntimeError("Missing uv {} for face {}".format(j, i))
-                loop[layer].uv = uvs[i][j]
+    def _timing(path, t):
+        """
+            private, accumulate cost of a write path
+        """
+        stat = BmeshEdit.timings.setdefault(path, [0, 0.0])
+        stat[0] += 1
+        stat[1] += time.perf_counter() - t
 
     @staticmethod
-    def _verts(bm, verts):
-        for i, v in enumerate(verts):
-            bm.verts[i].co = v
+    def report():
+        """
+            return cost of write paths and attributes written as list of strings
+        """
+        lines = []
+        for path, (calls, seconds) in sorted(BmeshEdit.timings.items()):
+            lines.append("{}: {} calls {:.3f}s avg {:.3f}ms".format(
+                path, calls, seconds, 1000 * seconds / max(1, calls)))
+        for key, (writes, size) in sorted(BmeshEdit.written.items()):
+            lines.append("{}: {} writes {} bytes".format(key, writes, size))
+        return lines
 
     @staticmethod
-    def buildmesh(context, o, verts, faces, matids=None, uvs=None, weld=False, clean=False):
+    def _same_topology(me, geom):
+        """
+            private, True when mesh faces and loops match
+            so geometry update only require attributes writes
+        """
+        if (len(me.vertices) != geom.n_verts or
+                len(me.loops) != geom.n_loops or
+                len(me.polygons) != geom.n_faces):
+            return False
+        if geom.uvs is not None and len(me.uv_layers) < 1:
+            return False
+        buf = np.empty(geom.n_loops, dtype=np.int32)
+        me.loops.foreach_get("vertex_index", buf)
+        if not np.array_equal(buf, geom.loops):
+            return False
+        buf = np.empty(geom.n_faces, dtype=np.int32)
+        me.polygons.foreach_get("loop_start", buf)
+        if not np.array_equal(buf, geom.loop_start):
+            return False
+        return True
+
+    @staticmethod
+    def _clear(me):
+        """
+            private, remove all geometry of mesh in object mode
+        """
+        if hasattr(me, "clear_geometry"):
+            me.clear_geometry()
+        else:
+            bm = bmesh.new()
+            bm.to_mesh(me)
+            bm.free()
+
+    @staticmethod
+    def _uv_layer(me):
+        """
+            private, return active uv layer, create one when missing
+        """
+        if len(me.uv_layers) < 1:
+            if hasattr(me, "uv_textures"):
+                me.uv_textures.new()
+            else:
+                me.uv_layers.new()
+        return me.uv_layers.active
+
+    @staticmethod
+    def writemesh(me, geom):
+        """
+            fill mesh data from MeshArrays in object mode,
+            without operator call nor selection and active object change
+            when topology did not change only write attributes that differ,
+            skip write when nothing changed
+            return {attribute: bytes written}
+        """
+        t = time.perf_counter()
+        report = {}
+        if BmeshEdit._same_topology(me, geom):
+            BmeshEdit._set(me.vertices, "co", geom.co, 'co', report)
+            if geom.matids is not None:
+                BmeshEdit._matids(me, geom.matids, report)
+            if geom.uvs is not None:
+                BmeshEdit._uvs(me, geom.uvs, report)
+            if report:
+                me.update()
+            BmeshEdit._timing('attributes' if report else 'skip', t)
+            return BmeshEdit._report(report)
+        BmeshEdit._clear(me)
+        me.vertices.add(geom.n_verts)
+        BmeshEdit._set(me.vertices, "co", geom.co, 'co', report, diff=False)
+        me.loops.add(geom.n_loops)
+        BmeshEdit._set(me.loops, "vertex_index", geom.loops, 'topology', report, diff=False)
+        me.polygons.add(geom.n_faces)
+        BmeshEdit._set(me.polygons, "loop_start", geom.loop_start, 'topology', report, diff=False)
+        BmeshEdit._set(me.polygons, "loop_total", geom.loop_total, 'topology', report, diff=False)
+        if geom.matids is not None:
+            BmeshEdit._matids(me, geom.matids, report, diff=False)
+        if geom.uvs is not None:
+            BmeshEdit._uvs(me, geom.uvs, report, diff=False)
+        me.update(calc_edges=True)
+        BmeshEdit._timing('data', t)
+        return BmeshEdit._report(report)
+
+    @staticmethod
+    def _weld(geom, weld, clean):
+        """
+            private, merge doubles and remove loose vertices on arrays
+        """
+        if not (weld or clean):
+            return geom
+        t = time.perf_counter()
+        if weld:
+            geom = weld_verts(geom, dist=0.001)
+        if clean:
+            geom = remove_loose(geom)
+        BmeshEdit._timing('weld', t)
+        return geom
+
+    @staticmethod
+    def commit(context, o, geom, weld=False, clean=False, fast=None):
+        """
+            rebuild mesh of object from MeshArrays
+            fast: use object mode write path, default to BmeshEdit.fast
+            weld and clean are done on arrays before a single write,
+            bmesh path use remove_doubles and delete_loose operators
+            return {attribute: bytes written}, None for bmesh path
+        """
+        if fast is None:
+            fast = BmeshEdit.fast
+        if fast:
+            return BmeshEdit.writemesh(o.data, BmeshEdit._weld(geom, weld, clean))
+        else:
+            BmeshEdit.buildmesh(context, o, geom.verts, geom.faces,
+                matids=None if geom.matids is None else geom.matids.tolist(),
+                uvs=geom.face_uvs, weld=weld, clean=clean, fast=False)
+
+    @staticmethod
+    def buildmesh(context, o, verts, faces, matids=None, uvs=None, weld=False, clean=False, fast=None):
+        """
+            rebuild mesh of object
+            fast: use object mode write path, default to BmeshEdit.fast
+            weld and clean are done on arrays before a single write,
+            bmesh path use remove_doubles and delete_loose operators,
+            it makes o active and selected, both are restored after
+            return {attribute: bytes written}, None for bmesh path
+        """
+        if fast is None:
+            fast = BmeshEdit.fast
+        if fast:
+            geom = MeshArrays.from_pydata(verts, faces, matids=matids, uvs=uvs)
+            return BmeshEdit.writemesh(o.data, BmeshEdit._weld(geom, weld, clean))
+        t = time.perf_counter()
+        # validate before editing
+        if matids is not None:
+            matids = flat_matids(matids, len(faces))
+        if uvs is not None:
+            uvs = flat_uvs(uvs, np.fromiter((len(f) for f in faces), dtype=np.int32, count=len(faces)))
+        old = context.scene.objects.active
+        selected = o.select
         bm = BmeshEdit._start(context, o)
         bm.clear()
         for v in verts:
@@ -84,34 +300,98 @@ class BmeshEdit():
         for f in faces:
             bm.faces.new([bm.verts[i] for i in f])
         bm.faces.ensure_lookup_table()
+        BmeshEdit._end(bm, o)
+        # faces order is kept, bulk set in object mode
+        written = {}
         if matids is not None:
-            BmeshEdit._matids(bm, matids)
+            BmeshEdit._matids(o.data, matids, written, diff=False)
         if uvs is not None:
-            BmeshEdit._uvs(bm, uvs)
+            BmeshEdit._uvs(o.data, uvs, written, diff=False)
         if weld:
+            bm = bmesh.new()
+            bm.from_mesh(o.data)
             bmesh.ops.remove_doubles(bm, verts=bm.verts, dist=0.001)
-        BmeshEdit._end(bm, o)
+            bm.to_mesh(o.data)
+            bm.free()
+        o.data.update()
         if clean:
             bpy.ops.object.mode_set(mode='EDIT')
             bpy.ops.mesh.select_all(action='SELECT')
             bpy.ops.mesh.delete_loose()
             bpy.ops.object.mode_set(mode='OBJECT')
+        # restore context
+        o.select = selected
+        context.scene.objects.active = old
+        BmeshEdit._timing('bmesh', t)
 
     @staticmethod
     def verts(context, o, verts):
         """
-            update vertex position of active object
+            update vertex position of object in object mode,
+            skip write when positions did not change
+            return {attribute: bytes written}
         """
-        bm = BmeshEdit._start(context, o)
-        BmeshEdit._verts(bm, verts)
-        BmeshEdit._end(bm, o)
+        t = time.perf_counter()
+        me = o.data
+        co = np.asarray(verts, dtype=np.float32).reshape(-1)
+        if len(co) != 3 * len(me.vertices):
+            raise RuntimeError("Got {} verts for {} mesh vertices".format(len(co) // 3, len(me.vertices)))
+        report = {}
+        if BmeshEdit._set(me.vertices, "co", co, 'co', report):
+            me.update()
+        BmeshEdit._timing('verts' if report else 'skip', t)
+        return BmeshEdit._report(report)
 
     @staticmethod
     def aspect(context, o, matids, uvs):
         """
-            update material id and uvmap of active object
+            update material id and uvmap of object in object mode
+            matids: material index of faces
+            uvs: list of uvs of faces, or array of uvs of loops
         """
-        bm = BmeshEdit._start(context, o)
-        BmeshEdit._matids(bm, matids)
-        BmeshEdit._uvs(bm, uvs)
-        BmeshEdit._end(bm, o)
+        return BmeshEdit._aspect(o.data, matids, uvs)
+
+    @staticmethod
+    def benchmark_aspect(sizes=(10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6)):
+        """
+            cost of aspect on meshes of quads, from lists of faces uvs
+            return list of (n loops, seconds)
+        """
+        res = []
+        for n_loops in sizes:
+            geom = quads(n_loops // 4)
+            me = bpy.data.meshes.new("benchmark")
+            BmeshEdit.writemesh(me, geom)
+            matids = geom.matids.tolist()
+            uvs = geom.face_uvs
+            t = time.perf_counter()
+            BmeshEdit._aspect(me, matids, uvs)
+            res.append((geom.n_loops, time.perf_counter() - t))
+            bpy.data.meshes.remove(me)
+        return res
+
+    @staticmethod
+    def benchmark_weld(context, sizes=(10, 100, 300)):
+        """
+            compare weld and clean on arrays against bmesh and operators path
+            on grids of quads not sharing vertices
+            return list of (n verts in, n verts out, arrays seconds, operators seconds)
+        """
+        res = []
+        for n in sizes:
+            geom = grid(n)
+            me = bpy.data.meshes.new("benchmark")
+            o = bpy.data.objects.new("benchmark", me)
+            context.scene.objects.link(o)
+            t = time.perf_counter()
+            BmeshEdit.commit(context, o, geom, weld=True, clean=True, fast=True)
+            t_arrays = time.perf_counter() - t
+            n_out = len(me.vertices)
+            t = time.perf_counter()
+            BmeshEdit.commit(context, o, geom, weld=True, clean=True, fast=False)
+            t_ops = time.perf_counter() - t
+            res.append((geom.n_verts, n_out, t_arrays, t_ops))
+            context.scene.objects.unlink(o)
+            bpy.data.objects.remove(o)
+            bpy.data.meshes.remove(me)
+        return res
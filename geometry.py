@@ -0,0 +1,422 @@
+# -*- coding:utf-8 -*-
+
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# <pep8 compliant>
+
+# ----------------------------------------------------------
+# Author: Stephen Leger (s-leger)
+#
+# ----------------------------------------------------------
+
+# Geometry kernel, pure python / numpy, does not depend on bpy
+# so geometry generation may be tested and profiled outside blender
+import time
+import numpy as np
+from hashlib import sha1
+from collections import namedtuple
+from itertools import chain
+
+
+# Generator version, bump when geometry output change
+# so meshes stamped with an older digest are rebuilt
+VERSION = 1
+
+# Parameters record of parametric object
+Parameters = namedtuple('Parameters', ('x', 'y', 'z'))
+
+
+def digest(p):
+    """
+        digest of parameters and generator version
+    """
+    return sha1(repr((VERSION, tuple(p))).encode('utf-8')).hexdigest()
+
+
+class MeshArrays():
+    """
+        Contiguous mesh arrays
+        co:         float32 (3 * n verts) vertex coords
+        loops:      int32 (n loops) vertex index of loops
+        loop_start: int32 (n faces) index of first loop of faces
+        loop_total: int32 (n faces) number of loops of faces
+        uvs:        float32 (2 * n loops) uv coords of loops, optional
+        matids:     int16 (n faces) material index of faces, optional
+    """
+    def __init__(self, co, loops, loop_start, loop_total, uvs=None, matids=None):
+        self.co = co
+        self.loops = loops
+        self.loop_start = loop_start
+        self.loop_total = loop_total
+        self.uvs = uvs
+        self.matids = matids
+
+    @property
+    def n_verts(self):
+        return len(self.co) // 3
+
+    @property
+    def n_loops(self):
+        return len(self.loops)
+
+    @property
+    def n_faces(self):
+        return len(self.loop_start)
+
+    @classmethod
+    def from_pydata(cls, verts, faces, matids=None, uvs=None):
+        """
+            build from lists of vertex coords, face vertex index,
+            material index of faces and uvs of faces
+        """
+        co = np.array(verts, dtype=np.float32).reshape(-1)
+        loop_total = np.fromiter((len(f) for f in faces), dtype=np.int32, count=len(faces))
+        loop_start = np.zeros(len(faces), dtype=np.int32)
+        np.cumsum(loop_total[:-1], out=loop_start[1:])
+        loops = np.fromiter(chain.from_iterable(faces), dtype=np.int32, count=int(loop_total.sum()))
+        if matids is not None:
+            matids = flat_matids(matids, len(faces))
+        if uvs is not None:
+            uvs = flat_uvs(uvs, loop_total)
+        return cls(co, loops, loop_start, loop_total, uvs=uvs, matids=matids)
+
+    @property
+    def verts(self):
+        """
+            list of vertex coords
+        """
+        return [tuple(co) for co in self.co.reshape(-1, 3).tolist()]
+
+    @property
+    def faces(self):
+        """
+            list of faces vertex index
+        """
+        loops = self.loops.tolist()
+        return [tuple(loops[s:s + t]) for s, t in zip(self.loop_start.tolist(), self.loop_total.tolist())]
+
+    @property
+    def face_uvs(self):
+        """
+            list of uvs of faces
+        """
+        if self.uvs is None:
+            return None
+        uvs = [tuple(uv) for uv in self.uvs.reshape(-1, 2).tolist()]
+        return [uvs[s:s + t] for s, t in zip(self.loop_start.tolist(), self.loop_total.tolist())]
+
+
+def flat_matids(matids, n_faces):
+    """
+        validate material index of faces
+        return int16 (n faces) array
+    """
+    matids = np.asarray(matids, dtype=np.int16).reshape(-1)
+    if len(matids) != n_faces:
+        raise RuntimeError("Got {} material ids for {} faces".format(len(matids), n_faces))
+    return matids
+
+
+def flat_uvs(uvs, loop_total):
+    """
+        validate uvs against number of loops of faces
+        uvs: list of uvs of faces, or array of uvs of loops
+        loop_total: int32 (n faces) number of loops of faces
+        return float32 (2 * n loops) array
+    """
+    n_faces = len(loop_total)
+    n_loops = int(loop_total.sum())
+    if isinstance(uvs, np.ndarray):
+        uvs = uvs.astype(np.float32, copy=False).reshape(-1)
+        if len(uvs) != 2 * n_loops:
+            raise RuntimeError("Got {} uvs for {} loops".format(len(uvs) // 2, n_loops))
+        return uvs
+    if len(uvs) < n_faces:
+        raise RuntimeError("Missing uvs for face {}".format(len(uvs)))
+    if len(uvs) > n_faces:
+        raise RuntimeError("Got uvs for {} faces, mesh has {} faces".format(len(uvs), n_faces))
+    counts = np.fromiter((len(face) for face in uvs), dtype=np.int32, count=n_faces)
+    bad = np.flatnonzero(counts != loop_total)
+    if len(bad) > 0:
+        i = int(bad[0])
+        if counts[i] < loop_total[i]:
+            raise RuntimeError("Missing uv {} for face {}".format(counts[i], i))
+        raise RuntimeError("Got {} uvs for face {} with {} loops".format(counts[i], i, loop_total[i]))
+    return np.fromiter(chain.from_iterable(chain.from_iterable(uvs)), dtype=np.float32, count=2 * n_loops)
+
+
+# half of the 3 x 3 x 3 cells around a cell, pairs of cells are probed once
+NEIGHBOUR_CELLS = [
+    (x, y, z)
+    for x in (-1, 0, 1)
+    for y in (-1, 0, 1)
+    for z in (-1, 0, 1)
+    if (x, y, z) > (0, 0, 0)
+    ]
+
+# 5 x 5 x 5 cells of size dist / 2 around a cell, hold every point closer than dist
+SNAP_CELLS = [
+    (x, y, z)
+    for x in range(-2, 3)
+    for y in range(-2, 3)
+    for z in range(-2, 3)
+    ]
+
+
+def _crowded(co, dist):
+    """
+        private, points having another point closer than dist may be,
+        points are bucketed in cells of size dist, a point alone in its cell
+        without points in neighbour cells has no point closer than dist
+        return bool (n) array
+    """
+    cell = np.floor(co / dist).astype(np.int64)
+    # pad by one cell so neighbours keys never wrap
+    cell -= cell.min(axis=0) - 1
+    dims = cell.max(axis=0) + 2
+    key = (cell[:, 0] * dims[1] + cell[:, 1]) * dims[2] + cell[:, 2]
+    cells, inverse, count = np.unique(key, return_inverse=True, return_counts=True)
+    crowded = count > 1
+    for x, y, z in NEIGHBOUR_CELLS:
+        neighbour = cells + (x * dims[1] + y) * dims[2] + z
+        other = np.searchsorted(cells, neighbour)
+        other[other == len(cells)] = 0
+        found = np.nonzero(cells[other] == neighbour)[0]
+        crowded[found] = True
+        crowded[other[found]] = True
+    return crowded[inverse]
+
+
+def _snap_targets(co, dist):
+    """
+        private, vertex each vertex is merged to, like remove_doubles
+        vertices are visited in order, a vertex is merged to the first target
+        closer than dist or become a target, merged vertices are never targets
+        so merges do not chain
+        return int (n) array
+    """
+    n = len(co)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+    # coincident vertices share the decision of the first one,
+    # lexsort is stable so first one of each position comes first
+    order = np.lexsort(co.T[::-1])
+    sorted_co = co[order]
+    new = np.ones(n, dtype=bool)
+    new[1:] = (sorted_co[1:] != sorted_co[:-1]).any(axis=1)
+    first = order[new]
+    position = np.empty(n, dtype=np.int64)
+    position[order] = np.cumsum(new) - 1
+    target = first.copy()
+
+    # isolated positions are targets, visit others in vertex order
+    pts = co[first]
+    visit = np.nonzero(_crowded(pts, dist))[0]
+    visit = visit[np.argsort(first[visit], kind='mergesort')]
+    # cells diagonal is less than dist so a cell hold at most one target
+    size = 0.5 * dist
+    keys = np.floor(pts[visit] / size).astype(np.int64).tolist()
+    dist2 = dist * dist
+    targets = {}
+    for i, p, (cx, cy, cz) in zip(visit.tolist(), pts[visit].tolist(), keys):
+        best = None
+        for x, y, z in SNAP_CELLS:
+            t = targets.get((cx + x, cy + y, cz + z))
+            if t is not None and (best is None or t[0] < best):
+                tx, ty, tz = t[1]
+                if (tx - p[0]) ** 2 + (ty - p[1]) ** 2 + (tz - p[2]) ** 2 <= dist2:
+                    best = t[0]
+        if best is None:
+            targets[(cx, cy, cz)] = (int(first[i]), p)
+        else:
+            target[i] = best
+    return target[position]
+
+
+def weld(geom, dist=0.001):
+    """
+        merge each vertex to the first vertex closer than dist not merged itself,
+        like remove_doubles merges do not chain, target coords are kept,
+        remap loops, drop consecutive duplicate loops, faces with less than 3 loops
+        and faces using a vertex more than once
+        return new MeshArrays, unused vertices are not removed, see remove_loose
+    """
+    target = _snap_targets(geom.co.reshape(-1, 3), dist)
+    first, remap = np.unique(target, return_inverse=True)
+    co = geom.co.reshape(-1, 3)[first].reshape(-1)
+    loops = remap.astype(np.int32)[geom.loops]
+
+    # next loop of each loop in its face
+    face_of_loop = np.repeat(np.arange(geom.n_faces, dtype=np.int32), geom.loop_total)
+    next_loop = np.arange(1, geom.n_loops + 1, dtype=np.int32)
+    next_loop[geom.loop_start + geom.loop_total - 1] = geom.loop_start
+    keep = loops != loops[next_loop]
+    loop_total = np.bincount(face_of_loop[keep], minlength=geom.n_faces).astype(np.int32)
+    valid = loop_total > 2
+    # faces still using a vertex twice, once sorted by face and vertex
+    kept = np.nonzero(keep)[0]
+    kept = kept[np.lexsort((loops[kept], face_of_loop[kept]))]
+    twice = (face_of_loop[kept[1:]] == face_of_loop[kept[:-1]]) & (loops[kept[1:]] == loops[kept[:-1]])
+    valid[face_of_loop[kept[1:]][twice]] = False
+    keep &= valid[face_of_loop]
+
+    loop_total = loop_total[valid]
+    loop_start = np.zeros(len(loop_total), dtype=np.int32)
+    np.cumsum(loop_total[:-1], out=loop_start[1:])
+    uvs, matids = geom.uvs, geom.matids
+    if uvs is not None:
+        uvs = uvs.reshape(-1, 2)[keep].reshape(-1)
+    if matids is not None:
+        matids = matids[valid]
+    return MeshArrays(co, loops[keep], loop_start, loop_total, uvs=uvs, matids=matids)
+
+
+def remove_loose(geom):
+    """
+        remove vertices not used by any face
+        return new MeshArrays
+    """
+    used = np.zeros(geom.n_verts, dtype=bool)
+    used[geom.loops] = True
+    remap = np.cumsum(used, dtype=np.int32) - 1
+    co = geom.co.reshape(-1, 3)[used].reshape(-1)
+    return MeshArrays(co, remap[geom.loops], geom.loop_start, geom.loop_total, uvs=geom.uvs, matids=geom.matids)
+
+
+def _constant(a, dtype):
+    """
+        read only array shared between results
+    """
+    a = np.array(a, dtype=dtype).reshape(-1)
+    a.setflags(write=False)
+    return a
+
+
+# box topology does not depend on parameters
+BOX_LOOPS = _constant([
+    (0, 1, 2, 3),
+    (7, 6, 5, 4),
+    (7, 4, 0, 3),
+    (4, 5, 1, 0),
+    (5, 6, 2, 1),
+    (6, 7, 3, 2)
+    ], np.int32)
+BOX_LOOP_START = _constant([0, 4, 8, 12, 16, 20], np.int32)
+BOX_LOOP_TOTAL = _constant([4, 4, 4, 4, 4, 4], np.int32)
+BOX_UVS = _constant([[(0, 0), (0, 1), (1, 1), (1, 0)]] * 6, np.float32)
+BOX_MATIDS = _constant([0, 0, 0, 0, 0, 0], np.int16)
+
+
+def box(p):
+    """
+        Parametric object geometry
+        p: Parameters record
+    """
+    x, y, z = p.x, p.y, p.z
+    co = np.array([
+        (0, y, 0),
+        (0, 0, 0),
+        (x, 0, 0),
+        (x, y, 0),
+        (0, y, z),
+        (0, 0, z),
+        (x, 0, z),
+        (x, y, z)
+        ], dtype=np.float32).reshape(-1)
+    return MeshArrays(co, BOX_LOOPS, BOX_LOOP_START, BOX_LOOP_TOTAL, uvs=BOX_UVS, matids=BOX_MATIDS)
+
+
+def quads(n_faces):
+    """
+        n disconnected unit quads with uvs and material index, for benchmarks
+    """
+    co = np.zeros((n_faces, 4, 3), dtype=np.float32)
+    co[:, :, 0] = np.arange(n_faces, dtype=np.float32)[:, None] * 2
+    co[:, 1:3, 0] += 1
+    co[:, 2:4, 1] = 1
+    loops = np.arange(4 * n_faces, dtype=np.int32)
+    loop_start = np.arange(0, 4 * n_faces, 4, dtype=np.int32)
+    loop_total = np.full(n_faces, 4, dtype=np.int32)
+    uvs = np.tile(np.array([0, 0, 1, 0, 1, 1, 0, 1], dtype=np.float32), n_faces)
+    matids = (np.arange(n_faces) % 2).astype(np.int16)
+    return MeshArrays(co.reshape(-1), loops, loop_start, loop_total, uvs=uvs, matids=matids)
+
+
+def grid(n):
+    """
+        n x n grid of quads not sharing vertices, for weld benchmarks
+    """
+    i, j = np.meshgrid(np.arange(n), np.arange(n), indexing='ij')
+    co = np.zeros((n * n, 4, 3), dtype=np.float32)
+    co[:, :, 0] = i.reshape(-1, 1) + np.array([0, 1, 1, 0])
+    co[:, :, 1] = j.reshape(-1, 1) + np.array([0, 0, 1, 1])
+    geom = quads(n * n)
+    geom.co = co.reshape(-1)
+    return geom
+
+
+def benchmark_aspect(sizes=(10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6)):
+    """
+        compare per loop assignment and flat arrays validation
+        of uvs and material index given as lists of faces
+        return list of (n loops, per loop seconds, flat seconds)
+    """
+    res = []
+    for n_loops in sizes:
+        geom = quads(n_loops // 4)
+        uvs = geom.face_uvs
+        matids = geom.matids.tolist()
+        t = time.perf_counter()
+        dst_uvs = np.empty((geom.n_loops, 2), dtype=np.float32)
+        dst_matids = np.empty(geom.n_faces, dtype=np.int16)
+        for i, matid in enumerate(matids):
+            dst_matids[i] = matid
+        for i, (s, n) in enumerate(zip(geom.loop_start.tolist(), geom.loop_total.tolist())):
+            for j in range(n):
+                dst_uvs[s + j] = uvs[i][j]
+        t_loop = time.perf_counter() - t
+        t = time.perf_counter()
+        flat_matids(matids, geom.n_faces)
+        flat_uvs(uvs, geom.loop_total)
+        t_flat = time.perf_counter() - t
+        res.append((geom.n_loops, t_loop, t_flat))
+    return res
+
+
+def benchmark_weld(sizes=(10, 100, 300, 1000)):
+    """
+        cost of weld and remove_loose on grids of quads not sharing vertices
+        return list of (n verts in, n verts out, seconds)
+    """
+    res = []
+    for n in sizes:
+        geom = grid(n)
+        t = time.perf_counter()
+        welded = remove_loose(weld(geom))
+        res.append((geom.n_verts, welded.n_verts, time.perf_counter() - t))
+    return res
+
+
+if __name__ == "__main__":
+    print("  loops   per loop (s)   flat arrays (s)")
+    for n_loops, t_loop, t_flat in benchmark_aspect():
+        print("{:>7} {:>14.5f} {:>17.5f}".format(n_loops, t_loop, t_flat))
+    print("verts in   verts out   weld (s)")
+    for n_in, n_out, seconds in benchmark_weld():
+        print("{:>8} {:>11} {:>10.5f}".format(n_in, n_out, seconds))
@@ -0,0 +1,333 @@
+# -*- coding:utf-8 -*-
+
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# <pep8 compliant>
+
+# ----------------------------------------------------------
+# Author: Stephen Leger (s-leger)
+#
+# ----------------------------------------------------------
+
+# Gl helpers, pure python / numpy, does not depend on bpy
+# so manipulators drawing stages may be tested and profiled outside blender
+import time
+import numpy as np
+from math import acos, ceil, pi
+from random import random
+
+
+def project(co, perspective_matrix, width, height):
+    """
+        batched view3d_utils.location_3d_to_region_2d
+        co: (n, 3) 3d coords
+        perspective_matrix: 4x4 region perspective matrix
+        width, height: region size in pixels
+        return (n, 2) region coords and (n) visibility mask
+        coords of points behind view are not meaningful
+    """
+    co = np.asarray(co, dtype=np.float64).reshape(-1, 3)
+    m = np.asarray(perspective_matrix, dtype=np.float64)
+    prj = co.dot(m[:, :3].T) + m[:, 3]
+    w = prj[:, 3]
+    visible = w > 0
+    w = np.where(visible, w, 1.0)
+    half = np.array([0.5 * width, 0.5 * height])
+    return half + half * prj[:, :2] / w[:, None], visible
+
+
+def project_point(co, perspective_matrix, width, height):
+    """
+        per point reference of project, pure python
+        return region coords or None when point is behind view
+    """
+    m = perspective_matrix
+    x, y, z = co
+    w = m[3][0] * x + m[3][1] * y + m[3][2] * z + m[3][3]
+    if w > 0:
+        px = m[0][0] * x + m[0][1] * y + m[0][2] * z + m[0][3]
+        py = m[1][0] * x + m[1][1] * y + m[1][2] * z + m[1][3]
+        return (0.5 * width * (1 + px / w), 0.5 * height * (1 + py / w))
+    return None
+
+
+def pixel_scale(co, perspective_matrix, width):
+    """
+        approximate size in pixels of a world unit at co
+        return 0 when co is behind view
+    """
+    m = np.asarray(perspective_matrix, dtype=np.float64)
+    w = m[3, :3].dot(co) + m[3, 3]
+    if w <= 0:
+        return 0
+    return 0.5 * width * np.sqrt(m[0, :3].dot(m[0, :3])) / w
+
+
+def arc_segments(pixel_radius, da, max_error=0.5, max_segments=128):
+    """
+        number of segments of an arc so chords stay
+        under max_error pixels from the arc
+        pixel_radius: arc radius in pixels
+        da: arc angle in radians
+    """
+    da = abs(da)
+    if pixel_radius <= max_error:
+        step = pi
+    else:
+        step = 2 * acos(1 - max_error / pixel_radius)
+    segments = int(ceil(da / step))
+    if da > pi:
+        segments = max(3, segments)
+    return min(max_segments, max(1, segments))
+
+
+class ArcCache():
+    """
+        Cache of arcs tessellation as offsets from arc center
+        keyed by (r, a0, da, rM, segments), rM a 3x3 tuple
+        hits and misses are counted for profiling
+    """
+    def __init__(self, size=1024):
+        self.size = size
+        self.cache = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, r, a0, da, rM, segments):
+        """
+            return (segments + 1, 3) offsets from center
+        """
+        key = (r, a0, da, rM, segments)
+        pts = self.cache.get(key)
+        if pts is not None:
+            self.hits += 1
+            return pts
+        self.misses += 1
+        a = a0 + da * np.linspace(0, 1, segments + 1)
+        local = np.zeros((segments + 1, 3))
+        local[:, 0] = r * np.cos(a)
+        local[:, 1] = r * np.sin(a)
+        pts = local.dot(np.asarray(rM, dtype=np.float64).T)
+        pts.setflags(write=False)
+        if len(self.cache) >= self.size:
+            self.cache.clear()
+        self.cache[key] = pts
+        return pts
+
+
+class HandleGrid():
+    """
+        2d bucket grid of handles region coords for hover and press queries
+        rebuilt only when handles positions change
+    """
+    def __init__(self, cell_size=20):
+        self.cell_size = cell_size
+        # {(i, j): [index of items]}
+        self.cells = {}
+        self.items = []
+        self.key = None
+        self.rebuilds = 0
+
+    def _cell(self, v):
+        return int(v // self.cell_size)
+
+    @staticmethod
+    def _item_key(item):
+        """
+            private, identity of item, of its members for tuples
+            built again on each redraw
+        """
+        if isinstance(item, tuple):
+            return tuple(id(member) for member in item)
+        return id(item)
+
+    def update(self, items):
+        """
+            items: list of (x, y, sensor_size, item)
+            return True when grid was rebuilt
+        """
+        key = [(x, y, size, self._item_key(item)) for x, y, size, item in items]
+        if key == self.key:
+            return False
+        self.key = key
+        self.items = items
+        self.cells = {}
+        self.rebuilds += 1
+        for index, (x, y, size, item) in enumerate(items):
+            for i in range(self._cell(x - size), self._cell(x + size) + 1):
+                for j in range(self._cell(y - size), self._cell(y + size) + 1):
+                    self.cells.setdefault((i, j), []).append(index)
+        return True
+
+    def query(self, x, y):
+        """
+            return items whose sensor area contains x, y
+            nearest first, in items order when at same distance
+        """
+        hits = []
+        for index in self.cells.get((self._cell(x), self._cell(y)), ()):
+            hx, hy, size, item = self.items[index]
+            dx, dy = x - hx, y - hy
+            if abs(dx) < size and abs(dy) < size:
+                hits.append((dx * dx + dy * dy, index, item))
+        hits.sort(key=lambda hit: hit[:2])
+        return [item for d, index, item in hits]
+
+    def clear(self):
+        self.cells = {}
+        self.items = []
+        self.key = None
+
+
+# Draw list primitive kinds
+# line strips, submitted as segments
+LINES = 'LINES'
+# convex polygons, submitted as triangles
+TRIS = 'TRIS'
+
+
+class DrawList():
+    """
+        Retained draw list of one frame
+        primitives are grouped by kind and line width
+        and flattened into contiguous vertex, colour and index arrays
+        so a frame is submitted with one indexed draw call per batch
+    """
+    def __init__(self):
+        # {(kind, width): {colour: [(n, 2) region coords]}}
+        self.groups = {}
+
+    def add(self, kind, colour, width, pos_2d):
+        """
+            kind: LINES or TRIS
+            pos_2d: (n, 2) region coords of primitive
+        """
+        if kind == TRIS:
+            width = 1
+        colours = self.groups.setdefault((kind, width), {})
+        colours.setdefault(tuple(colour), []).append(pos_2d)
+
+    @staticmethod
+    def _flatten(kind, prims):
+        """
+            private, vertices of primitives, each vertex once,
+            and index of line segments or triangles in vertices
+            return (n, 2) float32 vertices, (m) int32 index
+        """
+        co = np.concatenate([np.asarray(p, dtype=np.float32).reshape(-1, 2) for p in prims])
+        n = np.array([len(p) for p in prims])
+        prim = np.repeat(np.arange(len(prims)), n)
+        start = np.cumsum(n) - n
+        local = np.arange(len(co)) - start[prim]
+        if kind == LINES:
+            # segments (i, i + 1) of each strip
+            i = np.nonzero(local < n[prim] - 1)[0]
+            index = np.stack((i, i + 1), axis=1)
+        else:
+            # triangles fan (start, i, i + 1) of each polygon
+            i = np.nonzero((local > 0) & (local < n[prim] - 1))[0]
+            index = np.stack((start[prim[i]], i, i + 1), axis=1)
+        return co, index.reshape(-1).astype(np.int32)
+
+    def build(self):
+        """
+            return list of (kind, width, (n, 2) float32 vertices,
+            (n, 4) float32 colours, (m) int32 index of segments or triangles)
+        """
+        batches = []
+        for (kind, width), colours in sorted(self.groups.items()):
+            verts = []
+            cols = []
+            indices = []
+            count = 0
+            for colour, prims in colours.items():
+                v, index = self._flatten(kind, prims)
+                verts.append(v)
+                cols.append(np.tile(np.array(colour, dtype=np.float32), (len(v), 1)))
+                indices.append(index + count)
+                count += len(v)
+            indices = np.concatenate(indices)
+            if len(indices) > 0:
+                batches.append((kind, width, np.concatenate(verts), np.concatenate(cols), indices))
+        return batches
+
+
+def benchmark_drawlist(sizes=(100, 1000, 10000)):
+    """
+        build time of a draw list of size manipulators
+        3 lines and 2 triangle handles each
+        return list of (n manipulators, n vertices, seconds)
+    """
+    colours = [(1.0, 1.0, 1.0, 1.0), (1.0, 1.0, 0.0, 1.0), (0.0, 0.0, 0.0, 1.0)]
+    res = []
+    for n in sizes:
+        co = np.random.rand(n, 9, 2) * 1000
+        t = time.perf_counter()
+        drawlist = DrawList()
+        for i in range(n):
+            p = co[i]
+            drawlist.add(LINES, colours[0], 1, p[0:2])
+            drawlist.add(LINES, colours[0], 1, p[2:4])
+            drawlist.add(LINES, colours[0], 1, p[4:6])
+            drawlist.add(TRIS, colours[i % 3], 1, p[6:9])
+            drawlist.add(TRIS, colours[2], 1, p[6:9])
+        batches = drawlist.build()
+        seconds = time.perf_counter() - t
+        res.append((n, sum(len(b[2]) for b in batches), seconds))
+    return res
+
+
+def benchmark_projection(sizes=(100, 1000, 10000, 100000), width=1920, height=1080):
+    """
+        compare per point and batched projection, from list of coords
+        as gathered by manipulators and from an array
+        return list of (n points, per point seconds, batched seconds, array seconds)
+    """
+    # a perspective looking down -z from z = 10
+    perspective_matrix = [
+        [1.0, 0.0, 0.0, 0.0],
+        [0.0, 1.78, 0.0, 0.0],
+        [0.0, 0.0, -1.0, 9.8],
+        [0.0, 0.0, -1.0, 10.0]
+        ]
+    res = []
+    for n in sizes:
+        co = [(random(), random(), random()) for i in range(n)]
+        t = time.perf_counter()
+        for p in co:
+            project_point(p, perspective_matrix, width, height)
+        t_point = time.perf_counter() - t
+        t = time.perf_counter()
+        project(co, perspective_matrix, width, height)
+        t_batch = time.perf_counter() - t
+        co = np.array(co)
+        t = time.perf_counter()
+        project(co, perspective_matrix, width, height)
+        t_array = time.perf_counter() - t
+        res.append((n, t_point, t_batch, t_array))
+    return res
+
+
+if __name__ == "__main__":
+    print("points   per point (s)   batched (s)   array (s)")
+    for n, t_point, t_batch, t_array in benchmark_projection():
+        print("{:>6} {:>15.5f} {:>13.5f} {:>11.5f}".format(n, t_point, t_batch, t_array))
+    print("manipulators   vertices   draw list build (s)")
+    for n, n_verts, seconds in benchmark_drawlist():
+        print("{:>12} {:>10} {:>21.5f}".format(n, n_verts, seconds))
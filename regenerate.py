@@ -0,0 +1,165 @@
+# -*- coding:utf-8 -*-
+
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# <pep8 compliant>
+
+# ----------------------------------------------------------
+# Author: Stephen Leger (s-leger)
+#
+# ----------------------------------------------------------
+
+# Headless regeneration of parametric meshes in many .blend files
+#
+# Dispatcher, run with any python 3, one blender process per file:
+#   python regenerate.py --blender /path/to/blender --report report.json a.blend b.blend
+#
+# Worker, run by dispatcher for each file:
+#   blender -b a.blend --python regenerate.py -- --worker --result a.json
+#
+# Worker rebuild all meshes with resync(force=True) and save file in place.
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+
+# add-on package, the directory holding this file
+ADDON_DIR = os.path.dirname(os.path.abspath(__file__))
+ADDON_NAME = os.path.basename(ADDON_DIR)
+
+
+def worker(result):
+    """
+        run inside blender, regenerate meshes of loaded file and save it
+        result: path of json file to write rebuilt and skipped counts to
+    """
+    import bpy
+    import importlib
+    sys.path.insert(0, os.path.dirname(ADDON_DIR))
+    addon = importlib.import_module(ADDON_NAME)
+    if not hasattr(bpy.types.Mesh, "ParametricObjectProperty"):
+        addon.register()
+    addon.shared_meshes_sync(None)
+    rebuilt, skipped = addon.resync(bpy.context, force=True)
+    bpy.ops.wm.save_mainfile()
+    with open(result, "w") as f:
+        json.dump({'rebuilt': rebuilt, 'skipped': skipped}, f)
+
+
+def regenerate(blender, filepath, timeout=None):
+    """
+        regenerate a file in a blender process
+        return report entry of file
+    """
+    fd, result = tempfile.mkstemp(suffix=".json")
+    os.close(fd)
+    entry = {
+        'file': filepath,
+        'seconds': 0,
+        'rebuilt': 0,
+        'skipped': 0,
+        'error': None
+        }
+    args = [
+        blender, "-b", filepath, "--factory-startup",
+        "--python", os.path.abspath(__file__),
+        "--", "--worker", "--result", result
+        ]
+    t = time.perf_counter()
+    try:
+        proc = subprocess.run(
+            args,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            universal_newlines=True,
+            timeout=timeout
+            )
+        entry['seconds'] = time.perf_counter() - t
+        with open(result) as f:
+            content = f.read()
+        if proc.returncode != 0 or not content:
+            entry['error'] = "exit code {}\n{}".format(proc.returncode, proc.stdout[-2000:])
+        else:
+            entry.update(json.loads(content))
+    except (OSError, ValueError, subprocess.SubprocessError) as ex:
+        entry['seconds'] = time.perf_counter() - t
+        entry['error'] = "{}: {}".format(type(ex).__name__, ex)
+    finally:
+        os.remove(result)
+    return entry
+
+
+def dispatch(blender, files, workers=None, timeout=None):
+    """
+        regenerate files in parallel, one blender process per file
+        workers: number of concurrent blender processes, all cores when None
+        return report, entries in files order
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    t = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        entries = list(pool.map(lambda filepath: regenerate(blender, filepath, timeout), files))
+    return {
+        'workers': workers,
+        'seconds': time.perf_counter() - t,
+        'errors': sum(1 for entry in entries if entry['error'] is not None),
+        'files': entries
+        }
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Regenerate parametric meshes of .blend files")
+    parser.add_argument("files", nargs="*", help=".blend files to regenerate")
+    parser.add_argument("--blender", default="blender", help="blender executable")
+    parser.add_argument("--workers", type=int, default=None, help="concurrent blender processes, default all cores")
+    parser.add_argument("--timeout", type=float, default=None, help="seconds before a file is reported as failed")
+    parser.add_argument("--report", default=None, help="json report path, print to stdout when not set")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--result", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        worker(args.result)
+        return 0
+
+    report = dispatch(args.blender, args.files, args.workers, args.timeout)
+    if args.report is None:
+        print(json.dumps(report, indent=2))
+    else:
+        with open(args.report, "w") as f:
+            json.dump(report, f, indent=2)
+        print("{} files regenerated in {:.2f}s, {} errors".format(
+            len(report['files']), report['seconds'], report['errors']))
+    return 1 if report['errors'] else 0
+
+
+if __name__ == "__main__":
+    # inside blender, script arguments follow "--"
+    argv = sys.argv[1:]
+    if "--" in sys.argv:
+        argv = sys.argv[sys.argv.index("--") + 1:]
+    code = main(argv)
+    if code and "--" not in sys.argv:
+        sys.exit(code)
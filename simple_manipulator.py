@@ -27,17 +27,34 @@
 import bpy
 import bgl
 import blf
+import time
 from math import sin, cos, atan2, pi
 from mathutils import Vector, Matrix
 from mathutils.geometry import intersect_line_plane, intersect_point_line, intersect_line_sphere
 from bpy_extras import view3d_utils
 from bpy.types import PropertyGroup
-from bpy.props import EnumProperty, FloatVectorProperty, StringProperty, CollectionProperty, BoolProperty
+from bpy.props import (
+    EnumProperty, FloatVectorProperty, StringProperty,
+    CollectionProperty, BoolProperty, FloatProperty
+    )
+from .gl_utils import project, pixel_scale, arc_segments, ArcCache, DrawList, HandleGrid, LINES, TRIS
 
 # Arrow sizes (world units)
 arrow_size = 0.1
 # Handle area size (pixels)
 handle_size = 10
+# Number of manipulators redraw, allow rebuild once per redraw
+manip_frame = 0
+# Arcs tessellation cache, exposes hits and misses for profiling
+arc_cache = ArcCache()
+# Manipulate session state changed since last redraw request
+manip_dirty = False
+# Redraws requested and skipped by modal, for profiling
+manip_redraws = {'requested': 0, 'skipped': 0}
+# Number of set_pts calls by simple_manipulator pointer,
+# manipulators layout is computed again when it change,
+# only glproviders of manipulate session are tracked, cleared on exit
+manip_pts_version = {}
 
 # ------------------------------------------------------------------
 # Define Gl Handle types
@@ -47,7 +64,10 @@ handle_size = 10
 class Gl():
     """
         handle 3d -> 2d gl drawing
+        kind: DrawList primitive kind, None for text
     """
+    kind = None
+
     def __init__(self):
         self.width = 1
         self.pos_2d = Vector((0, 0))
@@ -60,34 +80,11 @@ class Gl():
     def colour(self):
         return self.colour_inactive
 
-    def position_2d_from_coord(self, context, coord):
-        """ coord given in local input coordsys
+    def lod(self, frame):
         """
-        region = context.region
-        rv3d = context.region_data
-        loc = view3d_utils.location_3d_to_region_2d(region, rv3d, coord, self.pos_2d)
-        return loc
-
-    def _end(self):
-        bgl.glEnd()
-        bgl.glPopAttrib()
-        bgl.glLineWidth(1)
-        bgl.glDisable(bgl.GL_BLEND)
-        bgl.glColor4f(0.0, 0.0, 0.0, 1.0)
-
-    def _start_poly(self, colour):
-        bgl.glPushAttrib(bgl.GL_ENABLE_BIT)
-        bgl.glEnable(bgl.GL_BLEND)
-        bgl.glColor4f(*colour)
-        bgl.glBegin(bgl.GL_POLYGON)
-
-    def _start_line(self, colour, width=1):
-        bgl.glPushAttrib(bgl.GL_ENABLE_BIT)
-        bgl.glEnable(bgl.GL_BLEND)
-        bgl.glEnable(bgl.GL_LINE)
-        bgl.glColor4f(*colour)
-        bgl.glLineWidth(width)
-        bgl.glBegin(bgl.GL_LINE_STRIP)
+            setup level of detail according on screen size
+        """
+        return
 
     def draw_text(self, text, x, y, angle, font_height, colour):
         # dirty fast assignment
@@ -98,21 +95,6 @@ class Gl():
         blf.size(font_id, font_height, dpi)
         blf.draw(font_id, text)
 
-    def draw(self, context):
-        gl_type = type(self).__name__
-        if 'Handle' in gl_type:
-            self._start_poly(self.colour)
-        elif gl_type in ['GlLine', 'GlArc']:
-            self._start_line(self.colour, self.width)
-        if gl_type == 'GlText':
-            x, y = self.position_2d_from_coord(context, self.pts[0])
-            self.draw_text(self.txt, x, y, self.angle, self.font_height, self.colour)
-        else:
-            for pt in self.pts:
-                x, y = self.position_2d_from_coord(context, pt)
-                bgl.glVertex2f(x, y)
-            self._end()
-
 
 class GlText(Gl):
 
@@ -136,7 +118,14 @@ class GlText(Gl):
     def txt(self):
         return self.label + str(round(self.value, self.round))
 
-    def set_pos(self, context, value, pos_3d, direction, normal=Vector((0, 0, 1))):
+    def draw(self, pos_2d):
+        """
+            pos_2d: region coords of pts projected by GlFrame
+        """
+        x, y = pos_2d[0]
+        self.draw_text(self.txt, x, y, self.angle, self.font_height, self.colour)
+
+    def set_pos(self, value, pos_3d, direction, normal=Vector((0, 0, 1))):
         self.up_axis = direction.normalized()
         self.c_axis = self.up_axis.cross(normal)
         self.pos_3d = pos_3d
@@ -145,6 +134,8 @@ class GlText(Gl):
 
 class GlLine(Gl):
 
+    kind = LINES
+
     def __init__(self, z_axis=Vector((0, 0, 1))):
         self.z_axis = z_axis
         self.p = Vector((0, 0, 0))
@@ -170,8 +161,12 @@ class GlLine(Gl):
         n.v = self.cross
         return n
 
-    def sized_normal(self, t, size):
-        n = GlLine()
+    def sized_normal(self, t, size, n=None):
+        """
+            n: GlLine to reuse, a new one when None
+        """
+        if n is None:
+            n = GlLine()
         n.p = self.lerp(t)
         n.v = size * self.cross.normalized()
         return n
@@ -194,6 +189,8 @@ class GlLine(Gl):
 
 class GlCircle(Gl):
 
+    kind = LINES
+
     def __init__(self):
         self.r = 0
         self.c = Vector((0, 0, 0))
@@ -223,9 +220,13 @@ class GlArc(GlCircle):
             y_axis,
             z_axis
         ])
+        # hashable rM, arc_cache key
+        self.rM_key = tuple(tuple(row) for row in self.rM)
         self.z_axis = z_axis
         self.a0 = 0
         self.da = 0
+        # number of segments, set by lod()
+        self.segments = None
 
     @property
     def length(self):
@@ -277,15 +278,25 @@ class GlArc(GlCircle):
             radius = self.r - offset
         return GlArc(self.c, radius, self.a0, self.da, z_axis=self.z_axis)
 
+    def lod(self, frame):
+        """
+            segments according radius in pixels
+        """
+        pixel_radius = self.r * pixel_scale(self.c, frame.perspective_matrix, frame.width)
+        self.segments = arc_segments(pixel_radius, self.da)
+
     @property
     def pts(self):
-        n_pts = max(1, int(round(abs(self.da) / pi * 30, 0)))
-        t_step = 1 / n_pts
-        return [self.lerp(i * t_step) for i in range(n_pts + 1)]
+        segments = self.segments
+        if segments is None:
+            segments = max(1, int(round(abs(self.da) / pi * 30, 0)))
+        return arc_cache.get(self.r, self.a0, self.da, self.rM_key, segments) + tuple(self.c)
 
 
 class GlHandle(Gl):
 
+    kind = TRIS
+
     def __init__(self, sensor_size, size, selectable=False):
         """
             sensor_size : 2d size in pixels of sensor area
@@ -301,11 +312,13 @@ class GlHandle(Gl):
         self.selectable = selectable
         Gl.__init__(self)
 
-    def set_pos(self, context, pos_3d, direction, normal=Vector((0, 0, 1))):
+    def set_pos(self, pos_3d, direction, normal=Vector((0, 0, 1))):
+        """
+            pos_2d is set by GlFrame projection
+        """
         self.up_axis = direction.normalized()
         self.c_axis = self.up_axis.cross(normal)
         self.pos_3d = pos_3d
-        self.pos_2d = self.position_2d_from_coord(context, pos_3d)
 
     def check_hover(self, pos_2d):
         dp = pos_2d - self.pos_2d
@@ -355,6 +368,92 @@ class TriHandle(GlHandle):
         return [self.pos_3d - x + y, self.pos_3d - x - y, self.pos_3d]
 
 
+class GlFrame():
+    """
+        view and projection data shared by all manipulators for one redraw
+        gather points of gl primitives, project them in one pass and draw
+    """
+    def __init__(self, context):
+        region = context.region
+        self.width = region.width
+        self.height = region.height
+        self.perspective_matrix = context.region_data.perspective_matrix.copy()
+        # gathered 3d points
+        self.co = []
+        # (gl primitive, start, end) of gl pts in co
+        self.items = []
+        self.pos_2d = None
+        self.visible = None
+
+    def add(self, gl):
+        """
+            gather pts of gl primitive,
+            for handles pos_3d is gathered after pts
+        """
+        gl.lod(self)
+        start = len(self.co)
+        self.co.extend(gl.pts)
+        end = len(self.co)
+        if isinstance(gl, GlHandle):
+            self.co.append(gl.pos_3d)
+        self.items.append((gl, start, end))
+
+    def project(self):
+        """
+            project all gathered points at once, set handles pos_2d
+        """
+        self.pos_2d, self.visible = project(self.co, self.perspective_matrix, self.width, self.height)
+        for gl, start, end in self.items:
+            if isinstance(gl, GlHandle) and self.visible[end]:
+                gl.pos_2d = Vector(self.pos_2d[end])
+
+    def _draw_batch(self, kind, width, verts, colours, indices):
+        """
+            private, submit a DrawList batch from client side arrays
+            with a single indexed draw call
+        """
+        verts_buf = bgl.Buffer(bgl.GL_FLOAT, len(verts) * 2, verts.reshape(-1).tolist())
+        colours_buf = bgl.Buffer(bgl.GL_FLOAT, len(colours) * 4, colours.reshape(-1).tolist())
+        indices_buf = bgl.Buffer(bgl.GL_INT, len(indices), indices.tolist())
+        bgl.glPushAttrib(bgl.GL_ENABLE_BIT)
+        bgl.glEnable(bgl.GL_BLEND)
+        if kind == LINES:
+            bgl.glLineWidth(width)
+            mode = bgl.GL_LINES
+        else:
+            mode = bgl.GL_TRIANGLES
+        bgl.glEnableClientState(bgl.GL_VERTEX_ARRAY)
+        bgl.glEnableClientState(bgl.GL_COLOR_ARRAY)
+        bgl.glVertexPointer(2, bgl.GL_FLOAT, 0, verts_buf)
+        bgl.glColorPointer(4, bgl.GL_FLOAT, 0, colours_buf)
+        bgl.glDrawElements(mode, len(indices), bgl.GL_UNSIGNED_INT, indices_buf)
+        bgl.glDisableClientState(bgl.GL_COLOR_ARRAY)
+        bgl.glDisableClientState(bgl.GL_VERTEX_ARRAY)
+        bgl.glPopAttrib()
+        bgl.glLineWidth(1)
+        bgl.glDisable(bgl.GL_BLEND)
+        bgl.glColor4f(0.0, 0.0, 0.0, 1.0)
+
+    def draw(self):
+        """
+            draw gl primitives with all points in front of view,
+            lines and handles through a DrawList, text in immediate mode
+        """
+        drawlist = DrawList()
+        texts = []
+        for gl, start, end in self.items:
+            if self.visible[start:end].all():
+                if gl.kind is None:
+                    texts.append((gl, start, end))
+                else:
+                    drawlist.add(gl.kind, gl.colour, gl.width, self.pos_2d[start:end])
+        for kind, width, verts, colours, indices in drawlist.build():
+            self._draw_batch(kind, width, verts, colours, indices)
+        pos_2d = self.pos_2d.tolist()
+        for gl, start, end in texts:
+            gl.draw(pos_2d[start:end])
+
+
 # ------------------------------------------------------------------
 # Define Manipulators
 # ------------------------------------------------------------------
@@ -373,17 +472,45 @@ class Manipulator():
         self.glprovider = glprovider
         self.origin = Vector((0, 0, 1))
         self.mouse_pos = Vector((0, 0))
-        args = (self, context)
-        self._handle = bpy.types.SpaceView3D.draw_handler_add(self.draw_callback, args, 'WINDOW', 'POST_PIXEL')
+        # key of glprovider points version
+        self.pts_key = glprovider.as_pointer()
+        manip_pts_version.setdefault(self.pts_key, 0)
+        # (points version, object matrix) of last layout
+        self.layout_version = None
+        self.layout_matrix = None
+
+    def draw_callback(self, context, frame):
+        """
+            layout on screen feedback, add gl primitives to frame,
+            called by manipulate session draw handler
+        """
+        raise NotImplementedError
+
+    @property
+    def handles(self):
+        """
+            gl handles, selectable ones are indexed for hover and press
+        """
+        return []
+
+    def layout_changed(self):
+        """
+            return True when object matrix or glprovider points
+            changed since last call, so world space layout must be computed again
+        """
+        version = manip_pts_version.get(self.pts_key, 0)
+        tM = self.o.matrix_world
+        if version == self.layout_version and tM == self.layout_matrix:
+            return False
+        self.layout_version = version
+        self.layout_matrix = tM.copy()
+        return True
 
     def exit(self):
         # print("Manipulator.exit() %s" % (type(self).__name__))
-        if self._handle is not None:
-            bpy.types.SpaceView3D.draw_handler_remove(self._handle, 'WINDOW')
         self.o = None
         self.datablock = None
         self.glprovider = None
-        self._handle = None
 
     def press(self):
         raise NotImplementedError
@@ -412,7 +539,7 @@ class Manipulator():
         """
         region = context.region
         rv3d = context.region_data
-        rM = context.active_object.matrix_world.to_3x3()
+        rM = self.o.matrix_world.to_3x3()
         view_vector_mouse = view3d_utils.region_2d_to_vector_3d(region, rv3d, self.mouse_pos)
         ray_origin_mouse = view3d_utils.region_2d_to_origin_3d(region, rv3d, self.mouse_pos)
         pt = intersect_line_plane(ray_origin_mouse, ray_origin_mouse + view_vector_mouse,
@@ -424,31 +551,27 @@ class Manipulator():
         return pt
 
     def get_value(self, data, attr, index=-1):
+        """
+            value of attribute, 0 when datablock has no such attribute or index
+        """
         try:
             if index > -1:
                 return getattr(data, attr)[index]
             else:
                 return getattr(data, attr)
-        except:
+        except (AttributeError, KeyError, IndexError):
             return 0
 
     def set_value(self, context, data, attr, value, index=-1):
-        try:
-            if self.get_value(data, attr, index) != value:
-                # switch context so unselected object may be manipulable too
-                old = context.active_object
-                state = self.o.select
-                self.o.select = True
-                context.scene.objects.active = self.o
-                if index > -1:
-                    getattr(data, attr)[index] = value
-                else:
-                    setattr(data, attr, value)
-                self.o.select = state
-                old.select = True
-                context.scene.objects.active = old
-        except:
-            pass
+        """
+            write value on datablock, datablock update rebuild its own data
+            so selection and active object are left untouched
+        """
+        if self.get_value(data, attr, index) != value:
+            if index > -1:
+                getattr(data, attr)[index] = value
+            else:
+                setattr(data, attr, value)
 
     def preTranslate(self, tM, vec):
         return tM * Matrix([
@@ -478,8 +601,9 @@ class SizeManipulator(Manipulator):
         self.label = GlText()
         Manipulator.__init__(self, context, o, datablock, glprovider)
 
-    def check_hover(self):
-        self.handle_right.check_hover(self.mouse_pos)
+    @property
+    def handles(self):
+        return [self.handle_left, self.handle_right]
 
     def press(self, context, event):
         if self.handle_right.hover:
@@ -488,7 +612,6 @@ class SizeManipulator(Manipulator):
         return False
 
     def release(self, context, event):
-        self.check_hover()
         self.handle_right.active = False
         return False
 
@@ -497,8 +620,6 @@ class SizeManipulator(Manipulator):
         if self.handle_right.active:
             self.update(context, event)
             return True
-        else:
-            self.check_hover()
         return False
 
     def update(self, context, event):
@@ -512,30 +633,31 @@ class SizeManipulator(Manipulator):
             length = round(length, 1)
         self.set_value(context, self.datablock, self.glprovider.prop1_name, length)
 
-    def draw_callback(self, _self, context):
-        """
-            draw on screen feedback using gl.
-        """
-        left, right, side, normal = self.glprovider.get_pts(self.o.matrix_world)
-        self.origin = left
-        self.line_1.p = left
-        self.line_1.v = right - left
-        self.line_0.z_axis = normal
-        self.line_1.z_axis = normal
-        self.line_2.z_axis = normal
-        self.label.z_axis = normal
-        self.line_0 = self.line_1.sized_normal(0, side.x * 1.1)
-        self.line_2 = self.line_1.sized_normal(1, side.x * 1.1)
-        self.line_1.offset(side.x * 1.0)
-        self.handle_left.set_pos(context, self.line_1.p, -self.line_1.v, normal=normal)
-        self.handle_right.set_pos(context, self.line_1.lerp(1), self.line_1.v, normal=normal)
-        self.label.set_pos(context, self.line_1.length, self.line_1.lerp(0.5), self.line_1.v, normal=normal)
-        self.label.draw(context)
-        self.line_0.draw(context)
-        self.line_1.draw(context)
-        self.line_2.draw(context)
-        self.handle_left.draw(context)
-        self.handle_right.draw(context)
+    def draw_callback(self, context, frame):
+        """
+            layout on screen feedback, gl primitives are drawn by frame.
+        """
+        if self.layout_changed():
+            left, right, side, normal = self.glprovider.get_pts(self.o.matrix_world)
+            self.origin = left
+            self.line_1.p = left
+            self.line_1.v = right - left
+            self.line_0.z_axis = normal
+            self.line_1.z_axis = normal
+            self.line_2.z_axis = normal
+            self.label.z_axis = normal
+            self.line_1.sized_normal(0, side.x * 1.1, self.line_0)
+            self.line_1.sized_normal(1, side.x * 1.1, self.line_2)
+            self.line_1.offset(side.x * 1.0)
+            self.handle_left.set_pos(self.line_1.p, -self.line_1.v, normal=normal)
+            self.handle_right.set_pos(self.line_1.lerp(1), self.line_1.v, normal=normal)
+            self.label.set_pos(self.line_1.length, self.line_1.lerp(0.5), self.line_1.v, normal=normal)
+        frame.add(self.label)
+        frame.add(self.line_0)
+        frame.add(self.line_1)
+        frame.add(self.line_2)
+        frame.add(self.handle_left)
+        frame.add(self.handle_right)
 
 
 # ------------------------------------------------------------------
@@ -572,7 +694,12 @@ class simple_manipulator(PropertyGroup):
     normal = FloatVectorProperty(subtype='XYZ', default=(0, 0, 1))
 
     def set_pts(self, pts):
+        global manip_dirty
         self.p0, self.p1, self.p2 = pts
+        key = self.as_pointer()
+        if key in manip_pts_version:
+            manip_pts_version[key] += 1
+        manip_dirty = True
 
     def get_pts(self, tM):
         rM = tM.to_3x3()
@@ -614,6 +741,137 @@ bpy.utils.register_class(simple_manipulator)
 # manipulate mode (at create time)
 manip_stack = []
 
+# single draw handler of manipulate session
+manip_draw_handle = None
+
+# selectable handles of manipulate session indexed by region coords
+manip_grid = HandleGrid(cell_size=2 * handle_size)
+# (manipulator, handle) under mouse
+manip_hover = None
+# manipulator with an active handle
+manip_active = None
+# [object, matrix_world at last redraw request] of manipulated objects
+manip_matrices = []
+# latest mouse move not processed yet while dragging
+manip_move = None
+# manip_frame of last processed mouse move
+manip_move_frame = -1
+# Mouse moves processed and dropped while dragging, for profiling
+manip_moves = {'processed': 0, 'dropped': 0}
+# timer flushing pending mouse move when no redraw occurs,
+# only running while a manipulator is dragged
+manip_timer = None
+# timer interval in seconds
+manip_timer_interval = 1 / 60
+# manipulators of other datablocks following active one value while dragging
+# [active manipulator, start value, [(manipulator, start value)]]
+manip_follow = None
+
+
+class EventSnapshot():
+    """
+        copy of event fields used by manipulators,
+        event is only valid during modal call
+    """
+    def __init__(self, event):
+        self.type = event.type
+        self.value = event.value
+        self.mouse_region_x = event.mouse_region_x
+        self.mouse_region_y = event.mouse_region_y
+        self.alt = event.alt
+        self.shift = event.shift
+        self.ctrl = event.ctrl
+
+
+def manipulable_draw(context):
+    """
+        draw all manipulators of manipulate session in one pass
+        with view data computed once per redraw
+    """
+    global manip_frame
+    manip_frame += 1
+    frame = GlFrame(context)
+    for m in manip_stack:
+        m.draw_callback(context, frame)
+    frame.project()
+    frame.draw()
+    manip_grid.update([
+        (h.pos_2d.x, h.pos_2d.y, h.sensor_size, (m, h))
+        for m in manip_stack for h in m.handles if h.selectable
+        ])
+
+
+def manipulable_hover(x, y):
+    """
+        set hover state of handle under mouse, nearest one when handles overlap
+        return (manipulator, handle) or None
+    """
+    global manip_hover
+    global manip_dirty
+    hits = manip_grid.query(x, y)
+    hover = None
+    if len(hits) > 0:
+        hover = hits[0]
+    if hover != manip_hover:
+        manip_dirty = True
+        if manip_hover is not None:
+            manip_hover[1].hover = False
+        if hover is not None:
+            hover[1].hover = True
+        manip_hover = hover
+    return hover
+
+
+def manipulable_redraw(context):
+    """
+        request a redraw only when hover, active, values
+        or manipulated objects matrix changed
+    """
+    global manip_dirty
+    for entry in manip_matrices:
+        o, matrix = entry
+        if o.matrix_world != matrix:
+            entry[1] = o.matrix_world.copy()
+            manip_dirty = True
+    if manip_dirty:
+        manip_dirty = False
+        manip_redraws['requested'] += 1
+        context.area.tag_redraw()
+    else:
+        manip_redraws['skipped'] += 1
+
+
+def manipulable_draw_enable(context):
+    global manip_draw_handle
+    if manip_draw_handle is None:
+        args = (context, )
+        manip_draw_handle = bpy.types.SpaceView3D.draw_handler_add(manipulable_draw, args, 'WINDOW', 'POST_PIXEL')
+
+
+def manipulable_timer_enable(context):
+    global manip_timer
+    if manip_timer is None:
+        manip_timer = context.window_manager.event_timer_add(manip_timer_interval, context.window)
+
+
+def manipulable_timer_disable(context):
+    global manip_timer
+    if manip_timer is not None:
+        context.window_manager.event_timer_remove(manip_timer)
+        manip_timer = None
+
+
+def manipulable_draw_disable():
+    global manip_draw_handle
+    if manip_draw_handle is not None:
+        bpy.types.SpaceView3D.draw_handler_remove(manip_draw_handle, 'WINDOW')
+        manip_draw_handle = None
+
+
+# datablocks with a manipulator being dragged
+# {datablock pointer: [last rebuild time, last rebuild frame, rebuild pending]}
+manip_throttle = {}
+
 # ------------------------------------------------------------------
 # Define Manipulable to make a PropertyGroup manipulable
 # ------------------------------------------------------------------
@@ -633,17 +891,45 @@ class Manipulable():
             default=False,
             description="Flag enable to rebuild manipulators when data model change"
             )
+    manipulable_rebuild = EnumProperty(
+            items=(
+                ('ALWAYS', 'Always', 'Rebuild on each change', 0),
+                ('INTERVAL', 'Interval', 'Rebuild at most once per interval while dragging', 1),
+                ('REDRAW', 'Redraw', 'Rebuild at most once per redraw while dragging', 2)
+            ),
+            default='INTERVAL',
+            description="Rebuild strategy while dragging a manipulator"
+            )
+    manipulable_interval = FloatProperty(
+            min=0, max=1,
+            default=0.05, precision=3,
+            description="Minimum time in seconds between rebuilds while dragging"
+            )
 
     def manipulable_disable(self, context):
         """
             disable gl draw handlers
         """
         global manip_stack
+        global manip_hover
+        global manip_active
+        global manip_dirty
+        global manip_move
 
         if not hasattr(self, "manip_stack"):
             # prevent blender crash by loosing reference on this one
             self.manip_stack = manip_stack
 
+        manipulable_draw_disable()
+        manipulable_timer_disable(context)
+        manip_move = None
+        manip_grid.clear()
+        manip_matrices.clear()
+        manip_pts_version.clear()
+        manip_hover = None
+        manip_active = None
+        manip_dirty = True
+
         for m in self.manip_stack:
             m.exit()
 
@@ -652,12 +938,105 @@ class Manipulable():
 
     def manipulable_setup(self, context):
         """
-            TODO: Implement the setup part as per parent object basis
+            setup manipulators of all objects returned by manipulable_objects
         """
         self.manipulable_disable(context)
-        o = context.active_object
-        for m in self.manipulators:
-            self.manip_stack.append(m.setup(context, o, self))
+        for o, d in self.manipulable_objects(context):
+            manip_matrices.append([o, o.matrix_world.copy()])
+            for m in d.manipulators:
+                self.manip_stack.append(m.setup(context, o, d))
+        manipulable_draw_enable(context)
+
+    def manipulable_objects(self, context):
+        """
+            Override to manipulate many objects at once
+            return list of (object, datablock), active one first
+        """
+        return [(context.active_object, self)]
+
+    def manipulable_throttle(self, context):
+        """
+            call in update() before rebuilding mesh
+            return True when rebuild must be deferred while dragging,
+            a final rebuild is done on release
+        """
+        state = manip_throttle.get(self.as_pointer())
+        if state is None or self.manipulable_rebuild == 'ALWAYS':
+            return False
+        now = time.perf_counter()
+        if self.manipulable_rebuild == 'INTERVAL':
+            deferred = now - state[0] < self.manipulable_interval
+        else:
+            deferred = state[1] == manip_frame
+        if deferred:
+            state[2] = True
+        else:
+            state[:] = [now, manip_frame, False]
+        return deferred
+
+    def manipulable_drag_start(self, context):
+        """
+            start deferring rebuilds according manipulable_rebuild,
+            and flushing pending mouse moves on timer
+        """
+        manip_throttle[self.as_pointer()] = [0, -1, False]
+        manipulable_timer_enable(context)
+
+    def manipulable_drag_end(self, context):
+        """
+            stop deferring rebuilds, update when a rebuild is pending,
+            remove timer once no datablock is dragged
+        """
+        state = manip_throttle.pop(self.as_pointer(), None)
+        if len(manip_throttle) == 0:
+            manipulable_timer_disable(context)
+        if state is not None and state[2]:
+            self.update(context)
+
+    def manipulable_follow_start(self, context, m):
+        """
+            manipulators of other datablocks for same property
+            follow value delta of active manipulator m while dragging
+        """
+        global manip_follow
+        attr = m.glprovider.prop1_name
+        seen = {m.datablock.as_pointer()}
+        followers = []
+        for f in self.manip_stack:
+            key = f.datablock.as_pointer()
+            if key not in seen and type(f) == type(m) and f.glprovider.prop1_name == attr:
+                seen.add(key)
+                followers.append((f, f.get_value(f.datablock, attr)))
+        manip_follow = [m, m.get_value(m.datablock, attr), followers]
+        m.datablock.manipulable_drag_start(context)
+        for f, value in followers:
+            f.datablock.manipulable_drag_start(context)
+
+    def manipulable_follow(self, context):
+        """
+            apply active manipulator value delta to followers,
+            one update per datablock
+        """
+        if manip_follow is None:
+            return
+        m, start, followers = manip_follow
+        attr = m.glprovider.prop1_name
+        delta = m.get_value(m.datablock, attr) - start
+        for f, value in followers:
+            f.set_value(context, f.datablock, attr, value + delta)
+
+    def manipulable_follow_end(self, context):
+        """
+            stop following, final update of pending datablocks
+        """
+        global manip_follow
+        if manip_follow is None:
+            return
+        m, start, followers = manip_follow
+        manip_follow = None
+        m.datablock.manipulable_drag_end(context)
+        for f, value in followers:
+            f.datablock.manipulable_drag_end(context)
 
     def manipulable_invoke(self, context):
         """
@@ -675,24 +1054,92 @@ class Manipulable():
             self.manipulable_refresh = False
             self.manipulable_setup(context)
 
-        context.area.tag_redraw()
-
         if event.type in {'RIGHTMOUSE', 'ESC'}:
+            self.manipulable_follow_end(context)
             self.manipulable_disable(context)
             self.manipulable_exit(context)
+            manipulable_redraw(context)
             return {'FINISHED'}
 
-        for m in self.manip_stack:
-            if m.modal(context, event):
-                self.manipulable_manipulate(context, type=type(m).__name__)
-                return {'RUNNING_MODAL'}
+        global manip_move
+
+        # coalesce mouse moves while dragging,
+        # process latest one at most once per redraw or on timer tick
+        if manip_active is not None and event.type in {'MOUSEMOVE', 'TIMER'}:
+            if event.type == 'MOUSEMOVE':
+                if manip_move is not None:
+                    manip_moves['dropped'] += 1
+                manip_move = EventSnapshot(event)
+            if event.type == 'TIMER' or manip_move_frame != manip_frame:
+                self.manipulable_flush(context)
+            manipulable_redraw(context)
+            return {'RUNNING_MODAL'}
+
+        # process pending move first to preserve press and release ordering
+        self.manipulable_flush(context)
+
+        if self.manipulable_dispatch(context, event):
+            manipulable_redraw(context)
+            return {'RUNNING_MODAL'}
 
         # allow any action on release
         if event.type == 'LEFTMOUSE' and event.value == 'RELEASE':
+            # final exact rebuild
+            self.manipulable_follow_end(context)
             self.manipulable_release(context)
 
+        manipulable_redraw(context)
         return {'PASS_THROUGH'}
 
+    def manipulable_flush(self, context):
+        """
+            process pending mouse move if any
+        """
+        global manip_move
+        global manip_move_frame
+        if manip_move is None:
+            return
+        event = manip_move
+        manip_move = None
+        manip_move_frame = manip_frame
+        manip_moves['processed'] += 1
+        self.manipulable_dispatch(context, event)
+
+    def manipulable_dispatch(self, context, event):
+        """
+            dispatch event to active or hovered manipulator
+            return True when a manipulator handled event
+        """
+        global manip_active
+        global manip_dirty
+
+        if event.type in {'MOUSEMOVE', 'LEFTMOUSE'} and manip_active is None:
+            manipulable_hover(event.mouse_region_x, event.mouse_region_y)
+
+        # only active or hovered manipulator handle events
+        if manip_active is not None:
+            targets = [manip_active]
+        elif manip_hover is not None:
+            targets = [manip_hover[0]]
+        else:
+            targets = []
+
+        if event.type == 'LEFTMOUSE' and event.value == 'RELEASE' and manip_active is not None:
+            manip_active = None
+            manip_dirty = True
+
+        for m in targets:
+            if m.modal(context, event):
+                if event.type == 'LEFTMOUSE' and event.value == 'PRESS':
+                    manip_active = m
+                    self.manipulable_follow_start(context, m)
+                elif event.type == 'MOUSEMOVE':
+                    self.manipulable_follow(context)
+                self.manipulable_manipulate(context, type=type(m).__name__)
+                manip_dirty = True
+                return True
+        return False
+
     # Callbacks
     def manipulable_release(self, context):
         """
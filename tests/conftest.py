@@ -0,0 +1,22 @@
+# Geometry kernel and gl helpers do not depend on bpy,
+# import them as top level modules so tests run without blender
+import os
+import sys
+import importlib
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture(scope="session")
+def addon():
+    """
+        registered add-on package, tests using it are skipped outside blender
+    """
+    bpy = pytest.importorskip("bpy")
+    sys.path.insert(0, os.path.dirname(ROOT))
+    module = importlib.import_module(os.path.basename(ROOT))
+    if not hasattr(bpy.types.Mesh, "ParametricObjectProperty"):
+        module.register()
+    return module
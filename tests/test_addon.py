@@ -0,0 +1,300 @@
+# Add-on tests, require bpy, run inside blender:
+# blender -b --python-expr "import pytest, sys; sys.exit(pytest.main(['tests']))"
+import pytest
+
+bpy = pytest.importorskip("bpy")
+
+
+@pytest.fixture
+def mesh(addon):
+    me = addon.new_mesh(bpy.context, addon.Parameters(1, 1, 1))
+    yield me
+    bpy.data.meshes.remove(me)
+
+
+def test_batch_rebuilds_once(addon, mesh):
+    d = mesh.ParametricObjectProperty[0]
+    count = addon.ParametricObjectProperty.rebuild_count
+    with d.batch(bpy.context):
+        d.x = 2
+        d.y = 3
+        d.z = 4
+    assert addon.ParametricObjectProperty.rebuild_count == count + 1
+    assert d.digest == addon.digest(d.params)
+    assert len(mesh.vertices) == 8
+
+
+def test_nested_batch_rebuilds_once(addon, mesh):
+    d = mesh.ParametricObjectProperty[0]
+    count = addon.ParametricObjectProperty.rebuild_count
+    with d.batch(bpy.context):
+        d.x = 2
+        with d.batch(bpy.context):
+            d.y = 3
+        assert addon.ParametricObjectProperty.rebuild_count == count
+        d.z = 4
+    assert addon.ParametricObjectProperty.rebuild_count == count + 1
+
+
+def test_set_many_rebuilds_once(addon, mesh):
+    d = mesh.ParametricObjectProperty[0]
+    count = addon.ParametricObjectProperty.rebuild_count
+    d.set_many(bpy.context, x=5, y=6, z=7)
+    assert addon.ParametricObjectProperty.rebuild_count == count + 1
+    assert d.params == addon.Parameters(5, 6, 7)
+
+
+def test_update_rebuilds_once_per_param(addon, mesh):
+    d = mesh.ParametricObjectProperty[0]
+    count = addon.ParametricObjectProperty.rebuild_count
+    d.x = 2
+    d.y = 3
+    assert addon.ParametricObjectProperty.rebuild_count == count + 2
+
+
+@pytest.fixture
+def objects():
+    """
+        objects linked to scene, removed with their meshes after test
+        objects(me, ...) link one object per mesh
+    """
+    created = []
+
+    def link(*meshes):
+        res = []
+        for me in meshes:
+            o = bpy.data.objects.new("Parametric Object", me)
+            bpy.context.scene.objects.link(o)
+            res.append(o)
+        created.extend(o.as_pointer() for o in res)
+        return res
+
+    yield link
+    # objects may have been removed or renamed by test
+    remaining = [o for o in bpy.data.objects if o.as_pointer() in created]
+    meshes = {o.data for o in remaining}
+    for o in remaining:
+        bpy.context.scene.objects.unlink(o)
+        bpy.data.objects.remove(o)
+    for me in meshes:
+        if me.users < 1:
+            bpy.data.meshes.remove(me)
+
+
+def test_split_gives_private_copy(addon, objects):
+    context = bpy.context
+    p = addon.Parameters(1, 2, 3)
+    me = addon.new_mesh(context, p, dedupe=True)
+    a, b = objects(me, me)
+    context.scene.objects.active = a
+    d = me.ParametricObjectProperty[0]
+    d.x = 5
+    assert b.data == me
+    assert a.data != me
+    copy = a.data.ParametricObjectProperty[0]
+    assert copy.shared_key == ""
+    assert copy.x == 5
+    assert d.params == p
+    assert addon.shared_mesh(d.shared_key) == me
+
+
+def test_share_does_not_flag_other_mesh(addon, objects):
+    context = bpy.context
+    me = addon.new_mesh(context, addon.Parameters(1, 2, 3), dedupe=True)
+    other = addon.new_mesh(context, addon.Parameters(4, 5, 6))
+    objects(me, other)
+    d = other.ParametricObjectProperty[0]
+    assert not d.share(me.ParametricObjectProperty[0].shared_key)
+    assert d.shared_key == ""
+    assert addon.shared_mesh(me.ParametricObjectProperty[0].shared_key) == me
+
+
+def test_manipulable_exit_shares_checkouts_only(addon, objects):
+    context = bpy.context
+    me = addon.new_mesh(context, addon.Parameters(1, 2, 3), dedupe=True)
+    private = addon.new_mesh(context, addon.Parameters(1, 2, 3))
+    a, b, c = objects(me, me, private)
+    addon.checkouts.update(addon.checkout_selection(context, [a]))
+    assert a.data != me
+    # selection at exit does not matter
+    c.select = True
+    a.data.ParametricObjectProperty[0].manipulable_exit(context)
+    assert a.data == me
+    assert b.data == me
+    assert c.data == private
+    assert addon.checkouts == {}
+
+
+def test_checkout_selection(addon, objects):
+    context = bpy.context
+    count = len(bpy.data.meshes)
+    me = addon.new_mesh(context, addon.Parameters(1, 2, 3), dedupe=True)
+    other = addon.new_mesh(context, addon.Parameters(4, 5, 6), dedupe=True)
+    a, b, c, d, e = objects(me, me, me, other, other)
+    # all users of other are selected, it is edited in place
+    checkouts = addon.checkout_selection(context, [a, b, d, e, a])
+    assert d.data == other and e.data == other
+    # selected users of me share a single copy
+    copy = a.data
+    assert copy != me and b.data == copy and c.data == me
+    assert len(bpy.data.meshes) == count + 3
+    assert checkouts == {
+        copy.as_pointer(): [a.as_pointer(), b.as_pointer()],
+        other.as_pointer(): [d.as_pointer(), e.as_pointer()]
+        }
+    # editing meshes of the session does not split them
+    addon.checkouts.update(checkouts)
+    context.scene.objects.active = d
+    other.ParametricObjectProperty[0].x = 7
+    assert d.data == other and e.data == other
+    context.scene.objects.active = a
+    copy.ParametricObjectProperty[0].set_many(context, x=7, y=5, z=6)
+    assert a.data == copy and b.data == copy
+    # copy has the same parameters as other now, its users move to other
+    copy.ParametricObjectProperty[0].manipulable_exit(context)
+    assert addon.checkouts == {}
+    assert a.data == b.data == d.data == e.data
+    assert c.data == me
+
+
+@pytest.mark.parametrize("table", [
+    '[{"x": null, "y": 1, "z": 1}]',
+    '[[1, 1, 1]]',
+    '{"x": 1, "y": 1, "z": 1}',
+    '[{"x": 1, "y": 1, "z": 1, "location": 1}]'
+    ])
+def test_read_table_type_errors(addon, tmp_path, table):
+    path = tmp_path / "table.json"
+    path.write_text(table)
+    with pytest.raises(TypeError):
+        addon.read_table(str(path))
+
+
+def test_read_table_locations(addon, tmp_path):
+    path = tmp_path / "table.json"
+    path.write_text('[{"x": 1, "y": 2, "z": 3, "location": [1, 2, 3]}, {"x": 4, "y": 5, "z": 6}]')
+    rows, locations = addon.read_table(str(path))
+    assert rows == [addon.Parameters(1, 2, 3), addon.Parameters(4, 5, 6)]
+    assert locations == [(1, 2, 3), None]
+
+
+def test_bulk_create_locations_mismatch(addon):
+    rows = [addon.Parameters(1, 1, 1)] * 3
+    with pytest.raises(RuntimeError):
+        addon.bulk_create(bpy.context, rows, locations=[(0, 0, 0)])
+
+
+def test_copy_to_selection_counts(addon, objects):
+    context = bpy.context
+    source = addon.new_mesh(context, addon.Parameters(1, 2, 3))
+    same = addon.new_mesh(context, addon.Parameters(1, 2, 3))
+    other = addon.new_mesh(context, addon.Parameters(4, 5, 6))
+    targets = objects(source, same, other, other)
+    d = source.ParametricObjectProperty[0]
+    rebuilt, updated = addon.copy_to_selection(context, d, targets)
+    # objects already using source parameters are not counted
+    assert (rebuilt, updated) == (1, 2)
+    assert other.ParametricObjectProperty[0].params == d.params
+
+
+def brute_force(addon):
+    return {o.as_pointer() for o in bpy.data.objects if addon.ParametricIndex._is_parametric(o)}
+
+
+def indexed(addon):
+    return {o.as_pointer() for o in addon.ParametricIndex.parametric_objects()}
+
+
+def test_index_matches_brute_force(addon, objects):
+    context = bpy.context
+    index = addon.ParametricIndex
+    index.rebuild()
+    meshes = [addon.new_mesh(context, addon.Parameters(1, 1, i + 1)) for i in range(20)]
+    created = objects(*meshes)
+    for o in created:
+        index.add(o)
+    # no full rebuild when objects are added through index
+    assert not index.dirty
+    assert index.count == len(bpy.data.objects)
+    assert indexed(addon) == brute_force(addon)
+    assert index.validate() == []
+
+    # renamed object
+    created[0].name = "Renamed"
+    assert indexed(addon) == brute_force(addon)
+
+    # object using a regular mesh
+    plain = bpy.data.meshes.new("plain")
+    created[1].data = plain
+    assert indexed(addon) == brute_force(addon)
+
+    # shared mesh users, index is notified on data change
+    created[2].data = meshes[3]
+    index.add(created[2])
+    users = {o.as_pointer() for o in index.users(meshes[3])}
+    assert users == {created[2].as_pointer(), created[3].as_pointer()}
+    assert index.validate() == []
+
+
+def test_index_removed_objects(addon, objects):
+    context = bpy.context
+    index = addon.ParametricIndex
+    me = addon.new_mesh(context, addon.Parameters(1, 1, 1))
+    o, keep = objects(me, me)
+    index.add(o)
+    index.add(keep)
+    context.scene.objects.unlink(o)
+    bpy.data.objects.remove(o)
+    # before any scene update, removed object is not returned
+    assert [u.as_pointer() for u in index.users(me)] == [keep.as_pointer()]
+    assert indexed(addon) == brute_force(addon)
+    assert index.validate() == []
+
+
+def test_async_commit_keeps_draining_on_failure(addon, objects):
+    from concurrent.futures import Future
+    context = bpy.context
+    bad = addon.new_mesh(context, addon.Parameters(1, 1, 1))
+    good = addon.new_mesh(context, addon.Parameters(1, 1, 1))
+    objects(bad, good)
+    for me, params in ((bad, addon.Parameters(2, 2, 2)), (good, addon.Parameters(3, 3, 3))):
+        d = me.ParametricObjectProperty[0]
+        with d.batch(context):
+            d.x, d.y, d.z = params
+        d.digest = ""
+        future = Future()
+        addon.async_jobs[me.as_pointer()] = [me.name, params, future]
+    failed = addon.async_stats['failed']
+    count = addon.ParametricObjectProperty.rebuild_count
+    addon.async_jobs[bad.as_pointer()][2].set_exception(RuntimeError("generator error"))
+    addon.async_jobs[good.as_pointer()][2].set_result(addon.box(addon.Parameters(3, 3, 3)))
+    assert not addon.async_commit()
+    assert addon.async_stats['failed'] == failed + 1
+    assert bad.ParametricObjectProperty[0].digest == ""
+    assert good.ParametricObjectProperty[0].digest == addon.digest(addon.Parameters(3, 3, 3))
+    assert addon.ParametricObjectProperty.rebuild_count == count + 1
+
+
+def test_bmesh_path_keeps_active_and_selection(addon, objects, monkeypatch):
+    context = bpy.context
+    monkeypatch.setattr(addon.BmeshEdit, "fast", False)
+    me = addon.new_mesh(context, addon.Parameters(1, 1, 1))
+    other = addon.new_mesh(context, addon.Parameters(2, 2, 2))
+    active, o = objects(other, me)
+    for c in context.scene.objects:
+        c.select = False
+    context.scene.objects.active = active
+    active.select = True
+    d = me.ParametricObjectProperty[0]
+    d.rebuild(context)
+    assert context.scene.objects.active == active
+    assert active.select and not o.select
+    assert d.digest == addon.digest(d.params)
+
+
+def test_load_handlers_order(addon):
+    handlers = list(bpy.app.handlers.load_post)
+    resync = handlers.index(addon.resync_on_load)
+    assert handlers.index(addon.index_dirty) < resync
+    assert handlers.index(addon.async_clear) < resync
+    assert handlers.index(addon.shared_meshes_sync) < resync
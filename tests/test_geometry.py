@@ -0,0 +1,179 @@
+import numpy as np
+import pytest
+
+import geometry
+from geometry import MeshArrays, Parameters, box, digest, weld, remove_loose, grid, flat_uvs, flat_matids
+
+
+def test_from_pydata_arrays():
+    geom = MeshArrays.from_pydata(
+        [(0, 0, 0), (1, 0, 0), (1, 1, 0), (0, 1, 0), (2, 0, 0)],
+        [(0, 1, 2, 3), (1, 4, 2)],
+        matids=[0, 1],
+        uvs=[[(0, 0), (1, 0), (1, 1), (0, 1)], [(0, 0), (1, 0), (0, 1)]])
+    assert geom.n_verts == 5
+    assert geom.n_loops == 7
+    assert geom.n_faces == 2
+    assert geom.co.dtype == np.float32
+    assert geom.loops.tolist() == [0, 1, 2, 3, 1, 4, 2]
+    assert geom.loop_start.tolist() == [0, 4]
+    assert geom.loop_total.tolist() == [4, 3]
+    assert geom.matids.dtype == np.int16
+    assert geom.matids.tolist() == [0, 1]
+    assert len(geom.uvs) == 14
+
+
+def test_from_pydata_round_trip():
+    verts = [(0.0, 0.0, 0.0), (1.0, 0.0, 0.0), (1.0, 1.0, 0.0)]
+    faces = [(0, 1, 2)]
+    uvs = [[(0.0, 0.0), (1.0, 0.0), (1.0, 1.0)]]
+    geom = MeshArrays.from_pydata(verts, faces, uvs=uvs)
+    assert geom.verts == verts
+    assert geom.faces == faces
+    assert geom.face_uvs == uvs
+    assert geom.matids is None
+
+
+TRI_QUAD = np.array([3, 4], dtype=np.int32)
+TRI_UVS = [(0, 0), (1, 0), (1, 1)]
+QUAD_UVS = [(0, 0), (1, 0), (1, 1), (0, 1)]
+
+
+def test_flat_uvs():
+    uvs = flat_uvs([TRI_UVS, QUAD_UVS], TRI_QUAD)
+    assert uvs.dtype == np.float32
+    assert uvs.tolist() == [0, 0, 1, 0, 1, 1, 0, 0, 1, 0, 1, 1, 0, 1]
+    assert flat_uvs(np.array(uvs, dtype=np.float64), TRI_QUAD).tolist() == uvs.tolist()
+
+
+@pytest.mark.parametrize("uvs, message", [
+    ([TRI_UVS], "Missing uvs for face 1"),
+    ([TRI_UVS, QUAD_UVS, TRI_UVS], "Got uvs for 3 faces, mesh has 2 faces"),
+    ([TRI_UVS, TRI_UVS], "Missing uv 3 for face 1"),
+    ([QUAD_UVS, QUAD_UVS], "Got 4 uvs for face 0 with 3 loops"),
+    (np.zeros((6, 2)), "Got 6 uvs for 7 loops"),
+    (np.zeros((8, 2)), "Got 8 uvs for 7 loops"),
+    ])
+def test_flat_uvs_mismatch(uvs, message):
+    with pytest.raises(RuntimeError, match=message):
+        flat_uvs(uvs, TRI_QUAD)
+
+
+def test_flat_matids():
+    matids = flat_matids([0, 2], 2)
+    assert matids.dtype == np.int16
+    assert matids.tolist() == [0, 2]
+    with pytest.raises(RuntimeError, match="Got 1 material ids for 2 faces"):
+        flat_matids([0], 2)
+    with pytest.raises(RuntimeError, match="Got 3 material ids for 2 faces"):
+        flat_matids([0, 1, 2], 2)
+
+
+def test_from_pydata_mismatch():
+    with pytest.raises(RuntimeError):
+        MeshArrays.from_pydata([(0, 0, 0), (1, 0, 0), (1, 1, 0)], [(0, 1, 2)], uvs=[])
+    with pytest.raises(RuntimeError):
+        MeshArrays.from_pydata([(0, 0, 0), (1, 0, 0), (1, 1, 0)], [(0, 1, 2)], matids=[0, 0])
+
+
+def test_box():
+    geom = box(Parameters(2, 3, 4))
+    assert geom.n_verts == 8
+    assert geom.n_faces == 6
+    assert geom.n_loops == 24
+    co = geom.co.reshape(-1, 3)
+    assert co.min(axis=0).tolist() == [0, 0, 0]
+    assert co.max(axis=0).tolist() == [2, 3, 4]
+    # every vertex is used by 3 faces
+    assert np.bincount(geom.loops).tolist() == [3] * 8
+    assert len(geom.uvs) == 2 * geom.n_loops
+    assert len(geom.matids) == geom.n_faces
+
+
+def test_box_topology_is_shared():
+    a = box(Parameters(1, 1, 1))
+    b = box(Parameters(2, 2, 2))
+    assert a.loops is b.loops
+    assert not a.loops.flags.writeable
+
+
+def test_digest_stability():
+    p = Parameters(1.0, 2.0, 3.0)
+    assert digest(p) == digest(Parameters(1.0, 2.0, 3.0))
+    assert digest(p) == digest((1.0, 2.0, 3.0))
+    assert digest(p) != digest(Parameters(1.0, 2.0, 3.5))
+    assert len(digest(p)) == 40
+
+
+def test_digest_depends_on_version(monkeypatch):
+    p = Parameters(1.0, 2.0, 3.0)
+    before = digest(p)
+    monkeypatch.setattr(geometry, "VERSION", geometry.VERSION + 1)
+    assert digest(p) != before
+
+
+def test_weld_across_cells():
+    # 0.0004 and 0.0006 are closer than dist but round to different cells
+    geom = MeshArrays.from_pydata(
+        [(0.0004, 0, 0), (1, 0, 0), (1, 1, 0), (0, 1, 0), (0.0006, 0, 0)],
+        [(0, 1, 2, 3), (4, 1, 2)])
+    welded = weld(geom, dist=0.001)
+    assert welded.n_verts == 4
+    assert welded.loops.tolist() == [0, 1, 2, 3, 0, 1, 2]
+    # first vertex coords are kept
+    assert welded.verts[0] == pytest.approx((0.0004, 0, 0))
+    assert weld(geom, dist=0.0001).n_verts == 5
+
+
+def test_weld_does_not_chain():
+    # each vertex is closer than dist to its neighbours only
+    co = [(i * 0.0009, 0, 0) for i in range(100)] + [(0, 1, 0)]
+    geom = MeshArrays.from_pydata(co, [(i, i + 1, 100) for i in range(99)])
+    welded = weld(geom, dist=0.001)
+    # odd vertices merge to previous even one, targets are never merged
+    assert welded.n_verts == 51
+    assert welded.verts[:50] == [tuple(geom.co.reshape(-1, 3)[i].tolist()) for i in range(0, 100, 2)]
+    # faces starting on an even vertex collapse
+    assert welded.n_faces == 49
+
+
+def test_weld_dense_cell():
+    rng = np.random.RandomState(0)
+    for co in (np.zeros((20000, 3)), rng.uniform(0, 0.0005, (20000, 3))):
+        geom = MeshArrays.from_pydata(co, [(0, 1, 2)])
+        welded = weld(geom, dist=0.001)
+        assert welded.n_verts == 1
+        assert welded.n_faces == 0
+        assert welded.verts[0] == tuple(geom.co[:3].tolist())
+
+
+def test_weld_drops_degenerate_faces():
+    geom = MeshArrays.from_pydata(
+        [(0, 0, 0), (1, 0, 0), (1, 1, 0), (0, 1, 0), (1, 1, 0.0001)],
+        [(0, 1, 2, 3), (0, 2, 1, 4), (2, 3, 4)],
+        matids=[1, 2, 3],
+        uvs=[[(0, 0), (1, 0), (1, 1), (0, 1)], [(0, 0), (1, 1), (1, 0), (2, 2)], [(1, 1), (0, 1), (2, 2)]])
+    welded = weld(geom)
+    # second face uses vertex 2 twice, not next to each other
+    # third face collapses to 2 loops
+    assert welded.n_faces == 1
+    assert welded.faces == [(0, 1, 2, 3)]
+    assert welded.matids.tolist() == [1]
+    assert welded.face_uvs == [[(0, 0), (1, 0), (1, 1), (0, 1)]]
+
+
+def test_weld_grid_and_remove_loose():
+    geom = grid(3)
+    assert geom.n_verts == 36
+    welded = weld(geom)
+    assert welded.n_verts == 16
+    assert welded.n_faces == 9
+    # vertices 0 and 3 are not used by any face
+    geom = MeshArrays.from_pydata(
+        [(5, 5, 5), (0, 0, 0), (1, 0, 0), (6, 6, 6), (1, 1, 0)],
+        [(1, 2, 4)],
+        uvs=[[(0, 0), (1, 0), (1, 1)]])
+    clean = remove_loose(geom)
+    assert clean.verts == [(0, 0, 0), (1, 0, 0), (1, 1, 0)]
+    assert clean.faces == [(0, 1, 2)]
+    assert clean.face_uvs == geom.face_uvs
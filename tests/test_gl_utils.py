@@ -0,0 +1,161 @@
+import numpy as np
+import pytest
+from math import pi
+
+from gl_utils import project, project_point, arc_segments, ArcCache, HandleGrid, DrawList, LINES, TRIS
+
+
+# a perspective looking down -z from z = 10
+PERSPECTIVE = [
+    [1.0, 0.0, 0.0, 0.0],
+    [0.0, 1.78, 0.0, 0.0],
+    [0.0, 0.0, -1.0, 9.8],
+    [0.0, 0.0, -1.0, 10.0]
+    ]
+
+
+def test_project_matches_project_point():
+    rng = np.random.RandomState(0)
+    co = rng.uniform(-5, 5, (200, 3))
+    # some points behind view
+    co[:20, 2] = 12
+    pos, visible = project(co, PERSPECTIVE, 1920, 1080)
+    assert pos.shape == (200, 2)
+    for p, xy, vis in zip(co.tolist(), pos, visible):
+        ref = project_point(p, PERSPECTIVE, 1920, 1080)
+        if ref is None:
+            assert not vis
+        else:
+            assert vis
+            assert xy == pytest.approx(ref)
+    assert not visible[:20].any()
+
+
+def test_project_list_input():
+    pos, visible = project([(0, 0, 0)], PERSPECTIVE, 100, 100)
+    assert pos.tolist() == [[50.0, 50.0]]
+    assert visible.tolist() == [True]
+
+
+def test_arc_segments():
+    # small arcs use a single segment
+    assert arc_segments(0.1, pi / 2) == 1
+    # full circles use at least 3 segments
+    assert arc_segments(0.1, 2 * pi) == 3
+    # segments grow with radius and are capped
+    assert arc_segments(10, pi) < arc_segments(100, pi) < arc_segments(1000, pi)
+    assert arc_segments(1e6, 2 * pi) == 128
+    assert arc_segments(1e6, 2 * pi, max_segments=32) == 32
+    # sign of angle does not matter
+    assert arc_segments(100, -pi) == arc_segments(100, pi)
+
+
+def test_arc_segments_error():
+    r, da = 100.0, pi
+    n = arc_segments(r, da, max_error=0.5)
+    # sagitta of chords stay under max error
+    assert r * (1 - np.cos(da / n / 2)) <= 0.5
+
+
+def test_arc_cache():
+    cache = ArcCache(size=2)
+    rM = ((1, 0, 0), (0, 1, 0), (0, 0, 1))
+    pts = cache.get(1, 0, pi, rM, 4)
+    assert pts.shape == (5, 3)
+    assert pts[0] == pytest.approx([1, 0, 0])
+    assert pts[2] == pytest.approx([0, 1, 0])
+    assert pts[-1] == pytest.approx([-1, 0, 0])
+    assert not pts.flags.writeable
+    assert cache.get(1, 0, pi, rM, 4) is pts
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_arc_cache_size():
+    cache = ArcCache(size=2)
+    rM = ((1, 0, 0), (0, 1, 0), (0, 0, 1))
+    for r in (1, 2, 3):
+        cache.get(r, 0, pi, rM, 4)
+    assert len(cache.cache) <= 2
+    assert cache.misses == 3
+
+
+def test_handle_grid_query_order():
+    grid = HandleGrid(cell_size=20)
+    grid.update([
+        (100, 100, 10, 'a'),
+        (105, 100, 10, 'b'),
+        (300, 300, 10, 'c'),
+        (110, 100, 10, 'd')
+        ])
+    # nearest first
+    assert grid.query(104, 100) == ['b', 'a', 'd']
+    assert grid.query(96, 100) == ['a', 'b']
+    assert grid.query(300, 305) == ['c']
+    assert grid.query(0, 0) == []
+
+
+def test_handle_grid_ties_keep_items_order():
+    grid = HandleGrid(cell_size=20)
+    grid.update([(110, 100, 10, 'a'), (100, 100, 10, 'b')])
+    assert grid.query(105, 100) == ['a', 'b']
+
+
+def test_handle_grid_rebuild():
+    grid = HandleGrid()
+    items = [(10, 10, 5, 'a')]
+    assert grid.update(items)
+    assert not grid.update(list(items))
+    assert grid.update([(20, 10, 5, 'a')])
+    assert grid.rebuilds == 2
+    grid.clear()
+    assert grid.query(20, 10) == []
+
+
+def test_handle_grid_rebuild_with_fresh_tuples():
+    # manipulable_draw builds new (manipulator, handle) tuples on each redraw
+    m, a, b = object(), object(), object()
+    grid = HandleGrid()
+    for frame in range(5):
+        grid.update([(10, 10, 5, (m, a)), (30, 10, 5, (m, b))])
+    assert grid.rebuilds == 1
+    assert grid.query(10, 10) == [(m, a)]
+    assert grid.update([(10, 10, 5, (m, b)), (30, 10, 5, (m, a))])
+    assert grid.rebuilds == 2
+
+
+def test_drawlist_flatten_strips_and_polygons():
+    strip = [(0, 0), (10, 0), (10, 10)]
+    co, index = DrawList._flatten(LINES, [strip, [(20, 0), (30, 0)]])
+    assert len(co) == 5
+    assert index.reshape(-1, 2).tolist() == [[0, 1], [1, 2], [3, 4]]
+    quad = [(0, 0), (10, 0), (10, 10), (0, 10)]
+    co, index = DrawList._flatten(TRIS, [quad, [(20, 0), (30, 0), (30, 10)]])
+    assert len(co) == 7
+    assert index.reshape(-1, 3).tolist() == [[0, 1, 2], [0, 2, 3], [4, 5, 6]]
+
+
+def test_drawlist_build_batches():
+    white = (1.0, 1.0, 1.0, 1.0)
+    red = (1.0, 0.0, 0.0, 1.0)
+    drawlist = DrawList()
+    drawlist.add(LINES, white, 1, [(0, 0), (10, 0), (10, 10)])
+    drawlist.add(LINES, red, 1, [(0, 0), (0, 10)])
+    drawlist.add(LINES, white, 2, [(0, 0), (5, 5)])
+    drawlist.add(TRIS, red, 3, [(0, 0), (10, 0), (10, 10), (0, 10)])
+    batches = drawlist.build()
+    # one batch per kind and width, tris ignore width
+    assert [(kind, width) for kind, width, *_ in batches] == [(LINES, 1), (LINES, 2), (TRIS, 1)]
+    for kind, width, verts, colours, indices in batches:
+        assert verts.dtype == np.float32 and colours.dtype == np.float32
+        assert len(verts) == len(colours)
+        assert indices.max() < len(verts)
+    kind, width, verts, colours, indices = batches[0]
+    # 2 segments of white strip, 1 of red segment, index offset across colours
+    segments = indices.reshape(-1, 2)
+    assert len(segments) == 3
+    seg_colours = sorted(tuple(colours[a]) + tuple(colours[b]) for a, b in segments)
+    assert seg_colours == sorted([white + white, white + white, red + red])
+    assert {tuple(verts[b]) for a, b in segments} == {(10, 0), (10, 10), (0, 10)}
+    kind, width, verts, colours, indices = batches[2]
+    assert len(indices) == 6
+    assert (colours == red).all()